@@ -1,11 +1,10 @@
 import streamlit as st
 from pathlib import Path
-from pdf_processor import PDFProcessor
-from conversation_generator import ConversationGenerator
-from audio_generator import XTTSPodcastGenerator
 from config import Config
-import os
-import torch
+from import_timer import timed_import, report_import_times
+from job_workspace import JobWorkspace
+from pdf_filter import PDFPreFilter
+from script_store import ScriptReader, ScriptWriter
 import time
 import asyncio
 import logging
@@ -16,27 +15,75 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def process_pdf_and_generate(pdf_path, config, status_text, progress_bar):
-    pdf_processor = PDFProcessor()
-    conversation_generator = ConversationGenerator(config.groq_api_key)
+@st.cache_resource
+def load_audio_generator(_config):
+    # One model and scheduler per server process, shared by every session
+    XTTSPodcastGenerator = timed_import("audio_generator").XTTSPodcastGenerator
+    audio_generator = XTTSPodcastGenerator(_config, use_gpu=True)
+    audio_generator.enable_scheduler(_config.tts_max_batch_size, _config.tts_max_wait_ms)
+    return audio_generator
+
+def show_preview(preview_slot, preview_task):
+    if preview_task.cancelled():
+        return
+    if preview_task.exception() is not None:
+        # A preview is a courtesy; the full podcast renders regardless
+        preview_slot.warning(f"⚠️ Preview failed, continuing with the full podcast: {preview_task.exception()}")
+        return
+    preview_path = preview_task.result()
+    if preview_path:
+        with preview_slot.container():
+            st.subheader("Preview")
+            st.audio(preview_path)
+
+async def process_pdf_and_generate(pdf_path, script_path, config, status_text, progress_bar,
+                                   render_preview=None, preview_slot=None):
+    pdf_processor = timed_import("pdf_processor").PDFProcessor(
+        prefilter=PDFPreFilter() if config.pdf_prefilter else None
+    )
+    conversation_generator = timed_import("conversation_generator").ConversationGenerator(
+        config.groq_api_key, max_workers=config.llm_max_workers,
+        section_lookahead=config.llm_section_lookahead
+    )
     
     status_text.text("📚 Processing PDF...")
     nodes = pdf_processor.process_pdf(pdf_path)
+    report = pdf_processor.filter_report
+    if report:
+        st.caption(
+            f"🧹 Skipped {report['nodes_dropped']} of {report['nodes_before']} sections "
+            f"({report['tokens_dropped']} of {report['tokens_before']} tokens): "
+            f"repeated headers/footers, references and numeric tables"
+        )
     progress_bar.progress(30)
     
     status_text.text("💭 Generating conversations...")
     conversations = []
-    for i, node in enumerate(nodes, 1):
-        status_text.text(f"🔄 Processing section {i}/{len(nodes)}")
-        conversation = await conversation_generator.generate_conversation_async(
-            chunk=node.text,
-            is_first_segment=(i == 1)
-        )
-        conversations.append(conversation)
-        progress_bar.progress(30 + (40 * i // len(nodes)))
+    preview_task = None
+    preview_shown = False
+    with ScriptWriter(script_path) as writer:
+        # Sequential unless LLM_SECTION_LOOKAHEAD opts into concurrent sections; saved in order
+        async for index, conversation in conversation_generator.iter_conversations_async(
+            [node.text for node in nodes]
+        ):
+            i = index + 1
+            status_text.text(f"🔄 Scripted section {i}/{len(nodes)}")
+            writer.append_conversation(conversation, nodes[index].node_id)
+            conversations.append(conversation)
+            progress_bar.progress(30 + (40 * i // len(nodes)))
+            # Synthesize the preview while the remaining sections are scripted
+            if render_preview and preview_task is None and (i >= config.preview_nodes or i == len(nodes)):
+                preview_task = asyncio.get_running_loop().run_in_executor(
+                    None, render_preview, "".join(conversations)
+                )
+            if preview_task is not None and preview_task.done() and not preview_shown:
+                show_preview(preview_slot, preview_task)
+                preview_shown = True
 
-    conversation_generator.save_conversations(conversations, config.text_output_path)
-    return "".join(conversations)
+    if preview_task is not None and not preview_shown:
+        await asyncio.wait([preview_task])
+        show_preview(preview_slot, preview_task)
+    return ScriptReader(script_path)
 
 def main():
     st.title("PDF to Podcast Generator")
@@ -44,35 +91,49 @@ def main():
     config = Config()
     root_dir = Path(__file__).parent.parent
     data_dir = root_dir / 'Data'
-    output_dir = data_dir / 'podcast_episodes'
-    output_dir.mkdir(parents=True, exist_ok=True)
     
     uploaded_file = st.file_uploader("Upload PDF file", type="pdf")
+    preview_enabled = st.checkbox(
+        f"Render a {config.preview_seconds}s preview first", value=True
+    )
     
     if uploaded_file:
         progress_bar = st.progress(0)
         status_text = st.empty()
+        # Each upload gets its own scratch space so concurrent sessions never collide
+        workspace = JobWorkspace(data_dir).create()
         
         try:
             start_time = time.time()
-            temp_pdf_path = data_dir / "temp.pdf"
-            with open(temp_pdf_path, "wb") as f:
+            with open(workspace.pdf_path, "wb") as f:
                 f.write(uploaded_file.getvalue())
 
             status_text.text("🎵 Initializing XTTS2 generator...")
-            use_gpu = torch.cuda.is_available()
-            audio_generator = XTTSPodcastGenerator(config, use_gpu=use_gpu)
+            audio_generator = load_audio_generator(config)
             progress_bar.progress(20)
 
-            if os.path.exists(config.text_output_path):
-                with open(config.text_output_path, 'r', encoding='utf-8') as f:
-                    full_text = f.read()
-            else:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                full_text = loop.run_until_complete(
-                    process_pdf_and_generate(temp_pdf_path, config, status_text, progress_bar)
+            preview_slot = st.empty()
+            render_preview = None
+            if preview_enabled:
+                def render_preview(script):
+                    return audio_generator.generate_preview(
+                        script,
+                        str(workspace.staging_dir / "preview.mp3"),
+                        config.preview_seconds * 1000,
+                        workspace.temp_audio_dir,
+                        workspace.job_id
+                    )
+
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            script = loop.run_until_complete(
+                process_pdf_and_generate(
+                    workspace.pdf_path, workspace.script_path, config, status_text, progress_bar,
+                    render_preview=render_preview, preview_slot=preview_slot
                 )
+            )
+
+            full_text = script.export_text(workspace.text_output_path)
 
             # Create two columns layout
             left_col, right_col = st.columns(2)
@@ -83,42 +144,22 @@ def main():
             
             with right_col:
                 st.subheader("Generated Episodes")
-                episode_slots = {}
             
+            report_import_times(config.import_time_budget)
             status_text.text("🎙️ Generating audio podcast...")
-            output_path = output_dir / "podcast_output.mp3"
-            audio_generator.generate_podcast(
-                text=full_text,
-                output_path=str(output_path)
+            audio_generator.generate_podcast_from_turns(
+                script.turns(),
+                output_path=str(workspace.staging_dir / "podcast_output.mp3"),
+                temp_dir=workspace.temp_audio_dir,
+                job_id=workspace.job_id
             )
+            output_dir = workspace.publish()
             progress_bar.progress(100)
 
-            # Monitor and display episodes
-            start_check_time = time.time()
-            previous_episode_count = 0
-            unchanged_count = 0
-
-            while time.time() - start_check_time < 300:  # 5-minute timeout
-                current_episodes = sorted(list(output_dir.glob("*.mp3")))
-                
-                # Check for new episodes
-                for episode in current_episodes:
-                    episode_path = str(episode)
-                    if episode_path not in episode_slots:
-                        with right_col:
-                            episode_slots[episode_path] = st.empty()
-                            episode_slots[episode_path].audio(episode_path)
-
-                # Check if we're done
-                if len(current_episodes) == previous_episode_count:
-                    unchanged_count += 1
-                    if unchanged_count >= 3:  # 30 seconds without changes
-                        break
-                else:
-                    unchanged_count = 0
-                    previous_episode_count = len(current_episodes)
-
-                time.sleep(10)
+            # Episodes are published atomically, so the listing is already complete
+            with right_col:
+                for episode in sorted(output_dir.glob("episode_*.mp3")):
+                    st.audio(str(episode))
 
             execution_time = time.time() - start_time
             status_text.text(f"✨ Completed in {execution_time:.2f} seconds")
@@ -128,8 +169,7 @@ def main():
             logger.error(f"❌ Error: {str(e)}", exc_info=True)
         
         finally:
-            if os.path.exists(temp_pdf_path):
-                os.remove(temp_pdf_path)
+            workspace.cleanup()
     else:
         st.info("Please upload a PDF file to begin.")
 
@@ -3,21 +3,34 @@ import re
 import numpy as np
 from pathlib import Path
 import concurrent.futures
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from pydub import AudioSegment
 import os
 import random
+import tempfile
 from tqdm import tqdm
-from TTS.api import TTS
+from audio_stream import AudioStream
+from backpressure import MemoryBudget
+from tts_backends import TTSBackend, XTTSBackend, create_backend
+from tts_scheduler import TTSScheduler
+from turn_parser import EMOTION_SPEED, detect_emotion, parse_turns
 import soundfile as sf
 from config import Config
 
 class XTTSPodcastGenerator:
-    def __init__(self, config: Config, use_gpu: bool = True):
+    PRECISIONS = XTTSBackend.PRECISIONS
+
+    def __init__(self, config: Config, use_gpu: bool = True,
+                 precision: Optional[str] = None, num_threads: Optional[int] = None,
+                 engine: Optional[str] = None, compile_mode: Optional[str] = None):
         print("\n🚀 Initializing XTTS2 Generator...")
         
         self.config = config
         self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
+        self.engine = engine or getattr(config, "tts_engine", "xtts")
+        self.precision = precision or getattr(config, "tts_precision", "fp32")
+        self.num_threads = num_threads or getattr(config, "tts_num_threads", None)
+        self.compile_mode = compile_mode or getattr(config, "tts_compile", "eager")
         if self.device == "cuda":
             torch.cuda.empty_cache()
             torch.backends.cudnn.benchmark = True
@@ -29,116 +42,208 @@ class XTTSPodcastGenerator:
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
         self._initialize_model()
-        
-        self.voices = {
-            'host': str(self.reference_audio_path / "female_02.wav"),
-            'expert': str(self.reference_audio_path / "male_01.wav")
-        }
-        
-        for role, path in self.voices.items():
-            if not os.path.exists(path):
-                raise FileNotFoundError(f"Voice file for {role} not found at {path}")
+        self.voices = self.backend.voices
+        self.sample_rate = self.backend.sample_rate
+        self.scheduler: Optional[TTSScheduler] = None
         
         self.MAX_CHUNK_SIZE = 15
-        self.MAX_WORKERS = 1
-        self.BATCH_SIZE = 1
+        self.MAX_WORKERS = getattr(config, "tts_max_workers", 1)
+        self.BATCH_SIZE = getattr(config, "tts_batch_size", 1)
         self.MAX_EPISODE_LENGTH = 1 * 60 * 1000
         
-        self._conversation_pattern = re.compile(
-            r'(Host|T\.E):\s*(?:\[[\w\s]+\])?\s*((?:(?!Host:|T\.E:).)*)',
-            re.DOTALL
-        )
-        
         self._setup_voice_patterns()
 
+    def _create_backend(self) -> TTSBackend:
+        backend = create_backend(
+            self.engine,
+            device=self.device,
+            precision=self.precision,
+            num_threads=self.num_threads,
+            compile_mode=self.compile_mode,
+            compile_cache_dir=getattr(self.config, "compile_cache_dir", None),
+            parity_tolerance=getattr(self.config, "compile_parity_tolerance", 0.05)
+        )
+        backend.load(self.reference_audio_path)
+        return backend
+
     def _initialize_model(self):
-        model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-        self.model = TTS(model_name).to(self.device)
-        torch.set_grad_enabled(False)
+        self.backend = self._create_backend()
+        self.model = self.backend.model
+        self.replicas: List[TTSBackend] = [self.backend]
+        # The backend may fall back (e.g. bf16 on CPUs without support, or a failed parity check)
+        self.precision = self.backend.precision
+        self.compile_mode = self.backend.compile_mode
+        print(f"🔊 TTS engine: {self.engine} ({self.precision}, {self.compile_mode}, {self.backend.sample_rate} Hz)")
+
+    def _load_replicas(self, count: int) -> List[TTSBackend]:
+        """Extra model copies for parallel synthesis; XTTS inference keeps per-call state on the model."""
+        while len(self.replicas) < count:
+            self.replicas.append(self._create_backend())
+        return self.replicas[:count]
+
+    def enable_scheduler(self, max_batch_size: int = 8, max_wait_ms: int = 50,
+                         replicas: Optional[int] = None) -> TTSScheduler:
+        """Route synthesis through a shared scheduler so concurrent jobs batch together.
+
+        ``replicas`` (default MAX_WORKERS) model copies serve the queue in parallel.
+        """
+        if self.scheduler is None:
+            backends = self._load_replicas(max(1, replicas or self.MAX_WORKERS))
+            print(f"🧵 TTS scheduler serving {len(backends)} model replica(s)")
+            self.scheduler = TTSScheduler(backends, max_batch_size, max_wait_ms).start()
+        return self.scheduler
+
+    def _synthesize(self, batch: List[Tuple[str, str]], job_id: str) -> List[Optional[np.ndarray]]:
+        if self.scheduler is not None:
+            return self.scheduler.synthesize(job_id, batch)
+        return self.backend.synthesize(batch)
 
     def _setup_voice_patterns(self):
         self.voice_settings = {
-            'neutral': {'speed': 1.0},
-            'excited': {'speed': 1.2},
-            'thoughtful': {'speed': 0.9},
-            'serious': {'speed': 1.0},
-            'confident': {'speed': 1.1}
+            emotion: {'speed': speed} for emotion, speed in EMOTION_SPEED.items()
         }
 
     def _detect_emotion(self, text: str, is_host: bool) -> str:
-        text_lower = text.lower()
-        if '!' in text:
-            return 'excited'
-        elif '?' in text:
-            return 'thoughtful'
-        elif any(word in text_lower for word in ['must', 'should', 'will']):
-            return 'serious'
-        elif any(word in text_lower for word in ['absolutely', 'certainly']):
-            return 'confident'
-        return 'neutral'
+        return detect_emotion(text)
 
     def _optimize_text(self, text: str) -> List[str]:
         sentences = re.split('[.!?]+', text)
         chunks = [s.strip() for s in sentences if s.strip()]
         return chunks
 
+    def _speakable_chunks(self, text: str) -> List[str]:
+        return [chunk for chunk in self._optimize_text(text) if len(chunk) >= 3]
+
     def _generate_audio_chunk(self, text: str, voice_path: str, emotion: str) -> Optional[np.ndarray]:
-        try:
-            wav = self.model.tts(
-                text=text,
-                speaker_wav=voice_path,
-                language="en"
-            )
-            return wav
-        except Exception as e:
-            print(f"❌ Error generating chunk: {str(e)}")
-            return None
+        return self.backend.synthesize([(text, voice_path)])[0]
 
-    def _process_segment(self, text: str, is_host: bool, emotion: str, index: int) -> Optional[str]:
+    def _job_temp_dir(self, temp_dir: Optional[Path] = None) -> Path:
+        if temp_dir is not None:
+            Path(temp_dir).mkdir(parents=True, exist_ok=True)
+            return Path(temp_dir)
+        # Unnamed callers still get a private directory so runs never clobber each other
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(dir=self.temp_dir))
+
+    def _process_segment(self, text: str, is_host: bool, emotion: str, index,
+                         temp_dir: Optional[Path] = None, job_id: str = "default") -> Optional[str]:
         try:
-            chunks = self._optimize_text(text)
+            chunks = self._speakable_chunks(text)
             voice_path = self.voices['host'] if is_host else self.voices['expert']
             
+            # The scheduler does its own batching, so hand it the whole turn at once
+            batch_size = len(chunks) if self.scheduler is not None else self.BATCH_SIZE
             all_audio = []
-            for chunk in chunks:
-                if len(chunk) < 3:
-                    continue
-                audio_array = self._generate_audio_chunk(chunk, voice_path, emotion)
-                if audio_array is not None:
-                    all_audio.append(audio_array)
+            for i in range(0, len(chunks), max(1, batch_size)):
+                batch = [(chunk, voice_path) for chunk in chunks[i:i + batch_size]]
+                all_audio.extend(a for a in self._synthesize(batch, job_id) if a is not None)
             
             if not all_audio:
                 return None
             
             combined_audio = np.concatenate([
-                np.concatenate([chunk, np.zeros(int(22050 * 0.2))])
+                np.concatenate([chunk, np.zeros(int(self.sample_rate * 0.2))])
                 for chunk in all_audio
             ])
             
-            output_path = self.temp_dir / f"segment_{index}.wav"
-            sf.write(str(output_path), combined_audio, 22050)
+            output_path = Path(temp_dir or self.temp_dir) / f"segment_{index}.wav"
+            sf.write(str(output_path), combined_audio, self.sample_rate)
             return str(output_path)
             
         except Exception as e:
             print(f"❌ Error processing segment: {str(e)}")
             return None
 
-    def generate_podcast(self, text: str, output_path: str):
+    def _parse_segments(self, text: str) -> List[Tuple[str, str]]:
+        return parse_turns(text)
+
+    def generate_preview(self, text: str, output_path: str, max_duration_ms: int = 60 * 1000,
+                         temp_dir: Optional[Path] = None, job_id: Optional[str] = None) -> Optional[str]:
+        return self.generate_preview_from_turns(
+            self._parse_segments(text), output_path, max_duration_ms, temp_dir, job_id
+        )
+
+    def generate_preview_from_turns(self, turns: Iterable[Tuple[str, str]], output_path: str,
+                                    max_duration_ms: int = 60 * 1000, temp_dir: Optional[Path] = None,
+                                    job_id: Optional[str] = None) -> Optional[str]:
+        """Render only as many turns as fit in max_duration_ms and export them as one clip."""
+        job_temp_dir = self._job_temp_dir(temp_dir)
+        job_id = job_id or job_temp_dir.name
+        preview_audio = AudioSegment.empty()
+        
+        try:
+            for i, (speaker, turn) in enumerate(turns):
+                if len(preview_audio) >= max_duration_ms:
+                    break
+                is_host = speaker == "Host"
+                segment_path = self._process_segment(
+                    text=turn,
+                    is_host=is_host,
+                    emotion=self._detect_emotion(turn, is_host),
+                    index=f"preview_{i}",
+                    temp_dir=job_temp_dir,
+                    job_id=job_id
+                )
+                if segment_path:
+                    if len(preview_audio) > 0:
+                        preview_audio += AudioSegment.silent(duration=250)
+                    preview_audio += AudioSegment.from_wav(segment_path)
+                    os.remove(segment_path)
+        finally:
+            if temp_dir is None:
+                self.cleanup(job_temp_dir)
+        
+        if len(preview_audio) == 0:
+            return None
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        preview_audio[:max_duration_ms].export(
+            str(output_path),
+            format="mp3",
+            parameters=["-q:a", "2"]
+        )
+        print(f"🎧 Saved preview ({len(preview_audio[:max_duration_ms]) / 1000:.1f}s) to {output_path}")
+        return str(output_path)
+
+    def generate_podcast(self, text: str, output_path: str, stream: Optional[AudioStream] = None,
+                         temp_dir: Optional[Path] = None, job_id: Optional[str] = None):
+        segments = self._parse_segments(text)
+        print(f"📊 Processing {len(segments)} segments")
+        self.generate_podcast_from_turns(segments, output_path, stream, temp_dir, job_id)
+
+    def generate_podcast_from_turns(self, turns: Iterable[Tuple[str, str]], output_path: str,
+                                    stream: Optional[AudioStream] = None,
+                                    temp_dir: Optional[Path] = None, job_id: Optional[str] = None,
+                                    budget: Optional[MemoryBudget] = None):
+        """Render turns as they are produced, e.g. straight from a streaming LLM response.
+
+        The episode being assembled is charged to ``budget`` (if given), so
+        upstream producers pause while a lot of unexported audio is held.
+        """
+        job_temp_dir = self._job_temp_dir(temp_dir)
+        job_id = job_id or job_temp_dir.name
+        charged = 0
+
+        def charge(nbytes: int):
+            nonlocal charged
+            if budget is not None:
+                budget.charge(nbytes)
+                charged += nbytes
+
+        def release_episode():
+            nonlocal charged
+            if budget is not None:
+                budget.release(charged)
+                charged = 0
+
         try:
-            matches = self._conversation_pattern.finditer(text)
-            segments = []
-            for m in matches:
-                if m.group(2).strip():
-                    text = re.sub(r'\[.*?\]', '', m.group(2)).strip()  # Remove emotion tags
-                    segments.append((m.group(1), ' '.join(text.split())))
-            
-            print(f"📊 Processing {len(segments)} segments")
             current_episode = 1
             current_audio = AudioSegment.empty()
+            streamed_turns = 0
             episodes_dir = Path(output_path).parent
             episodes_dir.mkdir(parents=True, exist_ok=True)
             
-            for i, (speaker, text) in enumerate(tqdm(segments)):
+            for i, (speaker, text) in enumerate(tqdm(turns)):
                 is_host = speaker == "Host"
                 emotion = self._detect_emotion(text, is_host)
                 
@@ -149,7 +254,9 @@ class XTTSPodcastGenerator:
                     text=text,
                     is_host=is_host,
                     emotion=emotion,
-                    index=i
+                    index=i,
+                    temp_dir=job_temp_dir,
+                    job_id=job_id
                 )
                 
                 if segment_path:
@@ -165,12 +272,20 @@ class XTTSPodcastGenerator:
                         print(f"💿 Saved Episode {current_episode}")
                         current_episode += 1
                         current_audio = AudioSegment.empty()
+                        release_episode()
                     
                     if len(current_audio) > 0:
                         current_audio += AudioSegment.silent(duration=250)
                     
                     current_audio += segment_audio
+                    charge(len(segment_audio.raw_data))
                     os.remove(segment_path)
+                    
+                    if stream is not None:
+                        # Listeners hear one continuous show, so pad every turn but the first
+                        stream.append(segment_audio if streamed_turns == 0
+                                      else AudioSegment.silent(duration=250) + segment_audio)
+                        streamed_turns += 1
             
             if len(current_audio) > 0:
                 episode_path = episodes_dir / f"episode_{current_episode}.mp3"
@@ -185,14 +300,22 @@ class XTTSPodcastGenerator:
             print(f"\n❌ Error generating podcast: {str(e)}")
             raise
         finally:
-            self.cleanup()
+            release_episode()
+            if stream is not None:
+                stream.close()
+            self.cleanup(job_temp_dir)
 
-    def cleanup(self):
-        if self.temp_dir.exists():
-            for file in self.temp_dir.glob("*.wav"):
+    def cleanup(self, temp_dir: Optional[Path] = None):
+        temp_dir = Path(temp_dir or self.temp_dir)
+        if temp_dir.exists():
+            for file in temp_dir.glob("*.wav"):
                 try:
                     file.unlink()
                 except Exception as e:
                     print(f"⚠️ Error removing {file}: {str(e)}")
-            self.temp_dir.rmdir()
+            try:
+                temp_dir.rmdir()
+            except OSError:
+                # Still holds another job's scratch directory
+                pass
             print("\n🧹 Cleanup complete!")
\ No newline at end of file
@@ -0,0 +1,113 @@
+import io
+import itertools
+import threading
+from collections import deque
+from typing import Deque, Iterator, Optional
+from pydub import AudioSegment
+
+
+class AudioStream:
+    """Append-only buffer of MP3 frames for one render.
+
+    The generator appends each finished turn; any number of listeners can
+    iterate over it concurrently, each from the beginning, blocking until
+    more audio arrives or the render is closed. Reading never consumes a
+    chunk, so late listeners share the same render instead of triggering a
+    new one.
+
+    With ``max_buffer_bytes`` set, the oldest chunks are dropped once the
+    buffer exceeds it, so a long render doesn't keep the whole show in
+    memory; listeners who fall that far behind skip ahead to live audio.
+    """
+
+    def __init__(self, job_id: str, max_buffer_bytes: Optional[int] = None):
+        self.job_id = job_id
+        self.max_buffer_bytes = max_buffer_bytes
+        self._chunks: Deque[bytes] = deque()
+        self._base = 0
+        self._buffered_bytes = 0
+        self._closed = False
+        self._listeners = 0
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _encode(audio: AudioSegment) -> bytes:
+        buffer = io.BytesIO()
+        # No ID3/Xing headers, so consecutive exports concatenate into one valid stream
+        audio.export(
+            buffer,
+            format="mp3",
+            parameters=["-q:a", "2", "-write_xing", "0", "-id3v2_version", "0"]
+        )
+        return buffer.getvalue()
+
+    def append(self, audio: AudioSegment):
+        data = self._encode(audio)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Stream {self.job_id} is already closed")
+            self._chunks.append(data)
+            self._buffered_bytes += len(data)
+            # Always keep the newest chunk, whatever its size
+            while (self.max_buffer_bytes and len(self._chunks) > 1
+                   and self._buffered_bytes > self.max_buffer_bytes):
+                chunk = self._chunks.popleft()
+                self._buffered_bytes -= len(chunk)
+                self._base += 1
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def discard(self):
+        """Close the stream and drop its buffer once no listener needs it."""
+        with self._condition:
+            self._closed = True
+            self._base += len(self._chunks)
+            self._chunks.clear()
+            self._buffered_bytes = 0
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def listeners(self) -> int:
+        return self._listeners
+
+    def wait_for_listeners(self, timeout: Optional[float] = None) -> bool:
+        """Block until no listener is connected (or ``timeout``); True if they all finished."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._listeners == 0, timeout)
+
+    def iter_chunks(self, start: int = 0, timeout: float = 30.0) -> Iterator[bytes]:
+        with self._condition:
+            self._listeners += 1
+        try:
+            yield from self._iter_chunks(start, timeout)
+        finally:
+            # Also runs when the server closes the generator on client disconnect
+            with self._condition:
+                self._listeners -= 1
+                self._condition.notify_all()
+
+    def _iter_chunks(self, start: int, timeout: float) -> Iterator[bytes]:
+        index = start
+        while True:
+            with self._condition:
+                while index >= self._base + len(self._chunks) and not self._closed:
+                    if not self._condition.wait(timeout):
+                        # Nothing new for a while; let the caller decide to keep waiting
+                        break
+                # Chunks before _base were evicted; resume from the oldest retained one
+                index = max(index, self._base)
+                pending = list(itertools.islice(self._chunks, index - self._base, None))
+                finished = self._closed
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= self._base + len(self._chunks):
+                return
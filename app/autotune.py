@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import torch
+from config import Config
+from audio_generator import XTTSPodcastGenerator
+from backpressure import available_memory_bytes
+from precision_report import CALIBRATION_SENTENCES
+
+# Rough resident footprint of one loaded XTTS model plus working buffers
+MODEL_MEMORY_GB = 3.0
+BATCH_CANDIDATES = (1, 2, 4, 8)
+
+
+def available_memory_gb() -> Optional[float]:
+    available = available_memory_bytes()
+    return round(available / 1024 ** 3, 2) if available else None
+
+
+def cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def thread_candidates(cores: int) -> List[int]:
+    candidates, n = [], 1
+    while n < cores:
+        candidates.append(n)
+        n *= 2
+    candidates.append(cores)
+    return candidates
+
+
+def measure_rtf(generator: XTTSPodcastGenerator, sentences: List[str], batch_size: int = 1) -> float:
+    voice = generator.voices['host']
+    elapsed = audio_samples = 0
+    for i in range(0, len(sentences), batch_size):
+        torch.manual_seed(i)
+        batch = [(sentence, voice) for sentence in sentences[i:i + batch_size]]
+        start = time.perf_counter()
+        wavs = generator.backend.synthesize(batch)
+        elapsed += time.perf_counter() - start
+        audio_samples += sum(len(wav) for wav in wavs if wav is not None)
+    audio_seconds = audio_samples / generator.sample_rate
+    return elapsed / audio_seconds if audio_seconds else float("inf")
+
+
+def fastest(measurements: Dict[int, float], tolerance: float = 0.05) -> int:
+    """Smallest setting whose RTF is within ``tolerance`` of the best one."""
+    best = min(measurements.values())
+    return min(k for k, v in measurements.items() if v <= best * (1 + tolerance))
+
+
+def autotune(config: Config, sentences: List[str]) -> Dict[str, object]:
+    cores = cpu_count()
+    memory_gb = available_memory_gb()
+    print(f"🖥️ {cores} cores, {memory_gb if memory_gb is not None else '?'} GB available")
+
+    generator = XTTSPodcastGenerator(config, use_gpu=True)
+    # Warm-up so model load and first-call allocation don't skew timings
+    generator._generate_audio_chunk(sentences[0], generator.voices['host'], "neutral")
+
+    measurements = {}
+    if generator.device == "cpu":
+        for threads in thread_candidates(cores):
+            torch.set_num_threads(threads)
+            measurements[threads] = measure_rtf(generator, sentences)
+            print(f"   {threads:>3} threads: RTF {measurements[threads]:.2f}")
+        best_threads = min(measurements, key=measurements.get)
+        torch.set_num_threads(best_threads)
+    else:
+        measurements[torch.get_num_threads()] = measure_rtf(generator, sentences)
+        best_threads = None
+
+    # Batching only pays off if the backend actually runs a batch faster than its items;
+    # ties go to the smaller batch, which splits better across replicas
+    batch_measurements = {}
+    for batch_size in BATCH_CANDIDATES:
+        if batch_size > len(sentences):
+            break
+        batch_measurements[batch_size] = measure_rtf(generator, sentences, batch_size)
+        print(f"   batch {batch_size:>2}: RTF {batch_measurements[batch_size]:.2f}")
+    best_batch = fastest(batch_measurements)
+
+    # Extra model replicas only pay off when cores are left idle by the best thread count
+    # and there is memory for another copy of the model
+    spare_cores = cores // best_threads if best_threads else 1
+    memory_slots = int(memory_gb // MODEL_MEMORY_GB) if memory_gb else 1
+    tts_workers = max(1, min(spare_cores, memory_slots))
+
+    best_rtf = min(batch_measurements.values())
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "host": {
+            "cpu_count": cores,
+            "memory_gb": memory_gb,
+            "device": generator.device,
+            "engine": generator.engine,
+            "precision": generator.precision,
+            "compile_mode": generator.compile_mode,
+        },
+        "measurements": {
+            "rtf_by_threads": {str(k): round(v, 3) for k, v in measurements.items()},
+            "rtf_by_batch_size": {str(k): round(v, 3) for k, v in batch_measurements.items()},
+        },
+        "settings": {
+            "tts_num_threads": best_threads,
+            "tts_max_workers": tts_workers,
+            "tts_batch_size": best_batch,
+            "tts_max_batch_size": best_batch,
+            # LLM calls are network-bound; scripting faster than TTS can consume is wasted
+            "llm_max_workers": max(1, min(8, round(tts_workers / best_rtf) + 1)) if best_rtf else 3,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe this machine and persist TTS/LLM worker settings")
+    parser.add_argument("--output", default=None, help="Profile path (defaults to TUNING_PROFILE_PATH)")
+    args = parser.parse_args()
+
+    config = Config()
+    profile = autotune(config, CALIBRATION_SENTENCES)
+    output_path = args.output or config.tuning_profile_path
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+
+    print(f"\n💾 Saved tuning profile to {output_path}")
+    for name, value in profile["settings"].items():
+        print(f"   {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
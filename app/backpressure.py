@@ -0,0 +1,216 @@
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path, 'r') as f:
+            value = f.read().strip()
+        return None if value == "max" else int(value)
+    except (OSError, ValueError):
+        return None
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process (Linux), or None if unknown."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memory this process can use: MemAvailable, capped by a cgroup limit if one is set."""
+    candidates = []
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    candidates.append(int(line.split()[1]) * 1024)
+    except OSError:
+        pass
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read_int(path)
+        # cgroup v1 reports "unlimited" as a huge sentinel value
+        if limit and limit < 1 << 60:
+            candidates.append(limit)
+    return min(candidates) if candidates else None
+
+
+def default_rss_limit(headroom: float = 0.85) -> Optional[int]:
+    """RSS ceiling that leaves (1 - headroom) of the currently available memory untouched."""
+    available = available_memory_bytes()
+    if available is None:
+        return None
+    return (rss_bytes() or 0) + int(available * headroom)
+
+
+class BudgetCancelled(RuntimeError):
+    pass
+
+
+class MemoryBudget:
+    """Global cap on bytes of text/audio in flight between pipeline stages.
+
+    Producers ``acquire`` before handing data downstream and consumers
+    ``release`` once it has been taken; consumers ``charge`` what they hold
+    (e.g. unexported audio) without waiting. Acquiring also waits while
+    process RSS is above ``rss_limit``. An item is always admitted when
+    nothing else is in flight or the consumer is starving, so an oversized
+    item, long-held audio or foreign memory use can slow the pipeline down
+    but never deadlock it.
+    """
+
+    def __init__(self, max_bytes: int, rss_limit: Optional[int] = None, poll_interval: float = 0.5):
+        self.max_bytes = max_bytes
+        self.rss_limit = rss_limit
+        self.poll_interval = poll_interval
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_rss = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def _over_budget(self, nbytes: int, starving: Optional[Callable[[], bool]] = None) -> bool:
+        if self.in_flight == 0 or (starving is not None and starving()):
+            return False
+        if self.in_flight + nbytes > self.max_bytes:
+            return True
+        rss = rss_bytes()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        return bool(self.rss_limit and rss and rss > self.rss_limit)
+
+    def acquire(self, nbytes: int, cancelled: Optional[Callable[[], bool]] = None,
+                starving: Optional[Callable[[], bool]] = None):
+        """Block until ``nbytes`` fit; raises ``BudgetCancelled`` once ``cancelled()`` is true.
+
+        ``starving()`` true means the consumer has nothing left to work on, so
+        waiting could never free memory; the item is admitted regardless.
+        """
+        with self._condition:
+            if self._over_budget(nbytes, starving):
+                self.waits += 1
+                while self._over_budget(nbytes, starving):
+                    if cancelled is not None and cancelled():
+                        raise BudgetCancelled("Consumer stopped while the producer was waiting for memory")
+                    # Poll so RSS drops caused by GC elsewhere are noticed too
+                    self._condition.wait(self.poll_interval)
+            self._add(nbytes)
+
+    def charge(self, nbytes: int):
+        """Count bytes held by a consumer without waiting; consumers drain the budget, so never block them."""
+        with self._condition:
+            self._add(nbytes)
+
+    def _add(self, nbytes: int):
+        self.in_flight += nbytes
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self, nbytes: int):
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - nbytes)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        rss = rss_bytes()
+        self.peak_rss = max(self.peak_rss, rss or 0)
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "rss": rss,
+            "peak_rss": self.peak_rss,
+            "waits": self.waits,
+        }
+
+
+class BoundedQueue:
+    """FIFO between two stages whose capacity is measured in bytes of a shared budget.
+
+    If the consumer dies it calls ``fail``: queued bytes are released and
+    any blocked or later ``put`` raises, so the producer stops instead of
+    waiting on a budget nobody will drain.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, budget: MemoryBudget):
+        self.budget = budget
+        self._items: Deque[Tuple[Any, int]] = deque()
+        self._condition = threading.Condition()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def put(self, item: Any, nbytes: int):
+        # Blocks the producer here when downstream stages are behind
+        self.budget.acquire(nbytes, cancelled=lambda: self.failed, starving=lambda: not self._items)
+        with self._condition:
+            if self._error is not None:
+                self.budget.release(nbytes)
+                raise BudgetCancelled(f"Consumer failed: {self._error}")
+            self._items.append((item, nbytes))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._items.append((self._CLOSED, 0))
+            self._condition.notify()
+
+    def fail(self, error: BaseException):
+        with self._condition:
+            self._error = error
+            queued = sum(nbytes for _, nbytes in self._items)
+            self._items.clear()
+        self.budget.release(queued)
+
+    def get(self) -> Any:
+        with self._condition:
+            while not self._items:
+                self._condition.wait()
+            item, nbytes = self._items.popleft()
+        self.budget.release(nbytes)
+        return item
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            if item is self._CLOSED:
+                return
+            yield item
+
+
+class RSSMonitor:
+    """Logs process RSS and budget usage periodically from a daemon thread."""
+
+    def __init__(self, budget: MemoryBudget, interval: float = 30.0):
+        self.budget = budget
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-monitor", daemon=True)
+
+    def start(self) -> "RSSMonitor":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stats = self.budget.stats()
+            logger.info(
+                f"🧠 RSS {(stats['rss'] or 0) / 1024 ** 2:.0f} MB, in flight "
+                f"{stats['in_flight'] / 1024 ** 2:.1f}/{self.budget.max_bytes / 1024 ** 2:.0f} MB, "
+                f"{stats['waits']} producer pauses"
+            )
@@ -1,28 +1,98 @@
 import os
+import json
+import logging
 from dotenv import load_dotenv
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 class Config:
     def __init__(self):
         # Load .env from root directory
         root_dir = Path(__file__).parent.parent
         load_dotenv(root_dir / '.env')
         
-        # API Keys
-        self.groq_api_key = os.getenv("GROQ_API_KEY")
-        if not self.groq_api_key:
-            raise ValueError("GROQ_API_KEY not found in environment variables")
+        # API Keys (validated on first use so audio-only runs don't need one)
+        self._groq_api_key = os.getenv("GROQ_API_KEY")
         
         self.pdf_path = os.getenv("PDF_PATH", os.path.join(root_dir, "Data/input.pdf"))
         self.refrence_audio_path = os.path.join(root_dir, "Data/reference_voices/")
         self.text_output_path = os.getenv("TEXT_OUTPUT_PATH", os.path.join(root_dir, "Data/output.txt"))
-        print(f"Current file location: {Path(__file__)}")
-        print(f"Root directory: {root_dir}")
-        print(f"Env file path: {root_dir / '.env'}")
-        print(f"PDF path: {os.path.join(root_dir, 'Data/input.pdf')}")
 
+        # Drop repeated headers/footers, reference sections and numeric tables before scripting
+        self.pdf_prefilter = os.getenv("PDF_PREFILTER", "1") != "0"
 
-Config()
+        # Preview: script only the first few PDF sections and render a short clip
+        self.preview_nodes = int(os.getenv("PREVIEW_NODES", "2"))
+        self.preview_seconds = int(os.getenv("PREVIEW_SECONDS", "60"))
 
-        
+        # TTS engine: xtts (quality) or vits (fast drafts/previews)
+        self.tts_engine = os.getenv("TTS_ENGINE", "xtts")
+        # TTS inference settings (CPU only): fp32, int8 or bf16
+        self.tts_precision = os.getenv("TTS_PRECISION", "fp32")
+        # XTTS graph acceleration: eager, compile (torch.compile) or torchscript (traced vocoder).
+        # Compiled artifacts are cached on disk and only kept if they pass a parity check vs eager
+        self.tts_compile = os.getenv("TTS_COMPILE", "eager")
+        self.compile_cache_dir = os.getenv("COMPILE_CACHE_DIR", os.path.join(root_dir, "Data/compile_cache"))
+        self.compile_parity_tolerance = float(os.getenv("COMPILE_PARITY_TOLERANCE", "0.05"))
+
+        # Machine-specific settings picked by autotune.py; env vars still take precedence
+        self.tuning_profile_path = os.getenv("TUNING_PROFILE_PATH", os.path.join(root_dir, "Data/tuning_profile.json"))
+        profile = self._load_tuning_profile(self.tuning_profile_path)
+        self.tts_num_threads = self._setting("TTS_NUM_THREADS", profile, None)
+        self.tts_batch_size = self._setting("TTS_BATCH_SIZE", profile, 1)
+        self.tts_max_workers = self._setting("TTS_MAX_WORKERS", profile, 1)
+        self.llm_max_workers = self._setting("LLM_MAX_WORKERS", profile, 3)
+        # Sections scripted concurrently; >1 trades script continuity for speed, so never tuned
+        self.llm_section_lookahead = int(os.getenv("LLM_SECTION_LOOKAHEAD", "1"))
+        # Cross-job batching: flush at this many sentences or after this many ms
+        self.tts_max_batch_size = self._setting("TTS_MAX_BATCH_SIZE", profile, 8)
+        self.tts_max_wait_ms = int(os.getenv("TTS_MAX_WAIT_MS", "50"))
+
+        # Backpressure: bytes of text/audio allowed in flight between stages, and the RSS
+        # ceiling at which producers pause (defaults to 85% of memory available at startup)
+        self.memory_budget_mb = int(os.getenv("MEMORY_BUDGET_MB", "64"))
+        rss_limit = os.getenv("RSS_LIMIT_MB")
+        self.rss_limit_mb = int(rss_limit) if rss_limit else None
+        # Live streams keep at most this much encoded audio for late listeners
+        self.stream_buffer_mb = int(os.getenv("STREAM_BUFFER_MB", "64"))
+        # After a render, keep serving until listeners disconnect, for at most this long
+        self.stream_drain_seconds = float(os.getenv("STREAM_DRAIN_SECONDS", "600"))
+
+        # Distributed rendering: task queue (SQLite path or <kind>://location) and the
+        # content-addressed result directory, both shared by every worker
+        self.work_queue_url = os.getenv("WORK_QUEUE_URL", os.path.join(root_dir, "Data/work_queue.db"))
+        self.work_results_dir = os.getenv("WORK_RESULTS_DIR", os.path.join(root_dir, "Data/tts_results"))
+        self.task_lease_seconds = int(os.getenv("TASK_LEASE_SECONDS", "600"))
+
+        # Warn when deferred stage imports take longer than this in total
+        self.import_time_budget = float(os.getenv("IMPORT_TIME_BUDGET", "5.0"))
+
+        logger.debug(f"Root directory: {root_dir}")
+        logger.debug(f"Env file path: {root_dir / '.env'}")
+        logger.debug(f"PDF path: {self.pdf_path}")
+
+    @staticmethod
+    def _load_tuning_profile(path: str) -> dict:
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("settings", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tuning profile {path}: {e}")
+            return {}
+
+    @staticmethod
+    def _setting(env_name: str, profile: dict, default):
+        value = os.getenv(env_name)
+        if value:
+            return int(value)
+        return profile.get(env_name.lower(), default)
+
+    @property
+    def groq_api_key(self) -> str:
+        if not self._groq_api_key:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+        return self._groq_api_key
 
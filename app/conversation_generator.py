@@ -3,16 +3,20 @@ from typing import List
 import os
 import asyncio
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, List, Dict, Any
+from collections import deque
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from turn_parser import SpeakerTurnParser
 
 class ConversationGenerator:
-    def __init__(self, api_key: str, max_history: int = 5, max_workers: int = 3):
+    def __init__(self, api_key: str, max_history: int = 5, max_workers: int = 3, section_lookahead: int = 1):
         self.client = AsyncGroq(api_key=api_key)
         self.conversation_history = []
         self.max_history = max_history
-        self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_workers = max(1, max_workers)
+        # Caps concurrent Groq requests however many callers are scripting at once
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        # Sections scripted ahead of the one being saved; above 1 a section no longer sees its predecessor
+        self.section_lookahead = max(1, section_lookahead)
 
     @staticmethod
     @lru_cache(maxsize=128)
@@ -50,24 +54,31 @@ T.E: [Expertise-based emotional delivery]"""
         if len(self.conversation_history) > self.max_history:
             self.conversation_history.pop(0)
 
-    async def generate_conversation_async(self, chunk: str, is_first_segment: bool) -> str:
+    def _build_messages(self, chunk: str, is_first_segment: bool, previous: Optional[str] = None) -> List[Dict[str, str]]:
+        context = "This is the first segment. Start with brief introductions." if is_first_segment else "Continue the ongoing conversation naturally."
+        
+        messages = [
+            {"role": "system", "content": self._get_system_prompt()},
+            {"role": "user", "content": f"{context}\n\nContent: {chunk}"}
+        ]
+        
+        if previous is None and self.conversation_history:
+            previous = self.conversation_history[-1]
+        if previous is not None:
+            messages.insert(1, {"role": "assistant", "content": previous})
+        return messages
+
+    async def generate_conversation_async(self, chunk: str, is_first_segment: bool, previous: Optional[str] = None) -> str:
         try:
-            context = "This is the first segment. Start with brief introductions." if is_first_segment else "Continue the ongoing conversation naturally."
-            
-            messages = [
-                {"role": "system", "content": self._get_system_prompt()},
-                {"role": "user", "content": f"{context}\n\nContent: {chunk}"}
-            ]
-            
-            if self.conversation_history:
-                messages.insert(1, {"role": "assistant", "content": self.conversation_history[-1]})
-
-            response = await self.client.chat.completions.create(
-                messages=messages,
-                model="mixtral-8x7b-32768",
-                temperature=0.7,
-                max_tokens=4096
-            )
+            messages = self._build_messages(chunk, is_first_segment, previous)
+
+            async with self._semaphore:
+                response = await self.client.chat.completions.create(
+                    messages=messages,
+                    model="mixtral-8x7b-32768",
+                    temperature=0.7,
+                    max_tokens=4096
+                )
             
             conversation = response.choices[0].message.content
             self.append_history(conversation)
@@ -76,6 +87,69 @@ T.E: [Expertise-based emotional delivery]"""
         except Exception as e:
             raise Exception(f"Error generating conversation: {str(e)}")
 
+    async def stream_conversation_async(self, chunk: str, is_first_segment: bool) -> AsyncIterator[Tuple[str, str, Optional[str]]]:
+        """Yield (speaker, text, emotion) turns as soon as each one is closed in the token stream.
+
+        ``emotion`` is the turn's leading ``[tag]``, or None if the LLM omitted it.
+
+        The full completion is still added to the history once the stream ends,
+        so ``conversation_history[-1]`` holds the raw text for saving.
+        """
+        try:
+            messages = self._build_messages(chunk, is_first_segment)
+
+            parser = SpeakerTurnParser(with_emotion=True)
+            parts = []
+            async with self._semaphore:
+                stream = await self.client.chat.completions.create(
+                    messages=messages,
+                    model="mixtral-8x7b-32768",
+                    temperature=0.7,
+                    max_tokens=4096,
+                    stream=True
+                )
+                async for event in stream:
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    for turn in parser.feed(delta):
+                        yield turn
+            for turn in parser.close():
+                yield turn
+            
+            self.append_history("".join(parts))
+            
+        except Exception as e:
+            raise Exception(f"Error generating conversation: {str(e)}")
+
+    async def iter_conversations_async(self, chunks: List[str]) -> AsyncIterator[Tuple[int, str]]:
+        """Script chunks in order, yielding ``(index, conversation)``.
+
+        By default each chunk is scripted after its predecessor and continues
+        from it. With ``section_lookahead`` above 1, that many chunks are
+        scripted at once: faster, but a chunk then continues from whichever
+        conversation finished last instead of its direct predecessor, which
+        weakens continuity between sections.
+        """
+        pending = deque()
+        next_index = 0
+        previous = None
+        try:
+            while pending or next_index < len(chunks):
+                while next_index < len(chunks) and len(pending) < self.section_lookahead:
+                    # Only a sequential run has the predecessor's text when the request goes out
+                    pending.append(asyncio.ensure_future(self.generate_conversation_async(
+                        chunks[next_index], next_index == 0, previous if self.section_lookahead == 1 else None
+                    )))
+                    next_index += 1
+                index = next_index - len(pending)
+                previous = await pending.popleft()
+                yield index, previous
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def process_chunks(self, chunks: List[str]) -> List[str]:
         tasks = []
         for i, chunk in enumerate(chunks):
@@ -0,0 +1,34 @@
+import importlib
+import logging
+import sys
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_import_times: Dict[str, float] = {}
+
+
+def timed_import(module_name: str):
+    """Import a pipeline stage the first time it is needed and record the cost."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_times[module_name] = time.perf_counter() - start
+    logger.info(f"📦 Loaded {module_name} in {_import_times[module_name]:.2f}s")
+    return module
+
+
+def import_times() -> Dict[str, float]:
+    return dict(_import_times)
+
+
+def report_import_times(budget: float) -> float:
+    total = sum(_import_times.values())
+    breakdown = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in _import_times.items())
+    if total > budget:
+        logger.warning(f"⏱️ Import time {total:.2f}s exceeds budget of {budget:.2f}s ({breakdown})")
+    else:
+        logger.info(f"⏱️ Import time {total:.2f}s within budget of {budget:.2f}s ({breakdown})")
+    return total
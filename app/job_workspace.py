@@ -0,0 +1,66 @@
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Job ids become directory names, so nothing that could climb out of Data/jobs
+JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def validate_job_id(job_id: str) -> str:
+    if not JOB_ID_PATTERN.match(job_id):
+        raise ValueError(f"Invalid job id '{job_id}': use only letters, digits, '-' and '_'")
+    return job_id
+
+
+class JobWorkspace:
+    """Per-job scratch and output storage under the Data directory.
+
+    Everything a job writes (uploaded PDF, script, temp segments, episodes)
+    lives in ``Data/jobs/<job_id>/`` until ``publish`` atomically renames
+    the finished episodes into ``Data/podcast_episodes/<job_id>/``, so
+    concurrent jobs never share a path and readers never see a partial set.
+    """
+
+    def __init__(self, data_dir: Path, job_id: Optional[str] = None):
+        self.job_id = validate_job_id(job_id) if job_id is not None else uuid.uuid4().hex[:12]
+        self.data_dir = Path(data_dir)
+        self.scratch_dir = self.data_dir / 'jobs' / self.job_id
+        self.temp_audio_dir = self.scratch_dir / 'temp_audio'
+        self.staging_dir = self.scratch_dir / 'episodes'
+        self.pdf_path = self.scratch_dir / 'input.pdf'
+        # Scripts are staged with the episodes so they are published (and reusable) with them
+        self.script_path = self.staging_dir / 'script.jsonl'
+        self.text_output_path = self.staging_dir / 'output.txt'
+        self.output_dir = self.data_dir / 'podcast_episodes' / self.job_id
+
+    def create(self) -> "JobWorkspace":
+        self.temp_audio_dir.mkdir(parents=True, exist_ok=True)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def _check_contained(self):
+        # Last line of defence before rmtree/replace: never touch anything outside this job's dirs
+        for path, root in ((self.scratch_dir, 'jobs'), (self.output_dir, 'podcast_episodes')):
+            parent = (self.data_dir / root).resolve()
+            if path.resolve().parent != parent:
+                raise ValueError(f"Job path {path} escapes {parent}")
+
+    def publish(self) -> Path:
+        """Move staged episodes to the public output directory in one rename."""
+        self._check_contained()
+        self.output_dir.parent.mkdir(parents=True, exist_ok=True)
+        if self.output_dir.exists():
+            # Re-publishing a job replaces its previous output wholesale
+            retired = self.output_dir.with_name(f".{self.job_id}.old")
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(self.output_dir, retired)
+            shutil.rmtree(retired, ignore_errors=True)
+        os.replace(self.staging_dir, self.output_dir)
+        return self.output_dir
+
+    def cleanup(self):
+        self._check_contained()
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
@@ -1,13 +1,17 @@
 from pathlib import Path
-from pdf_processor import PDFProcessor
-from conversation_generator import ConversationGenerator
-from audio_generator import XTTSPodcastGenerator
 from config import Config
-import os
-import torch
+from import_timer import timed_import, report_import_times
+from backpressure import BoundedQueue, MemoryBudget, RSSMonitor, default_rss_limit
+from job_workspace import JobWorkspace, validate_job_id
+from pdf_filter import PDFPreFilter
+from script_store import ScriptReader, ScriptWriter
+from turn_parser import parse_turns
 import time
 import asyncio
+import argparse
+from contextlib import suppress
 import logging
+from typing import Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,8 +19,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def main():
+def parse_turn_range(value: str) -> Tuple[int, Optional[int]]:
+    start, _, stop = value.partition(":")
+    try:
+        return int(start or 0), int(stop) if stop else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected START:STOP, got '{value}'")
+
+def parse_job_id(value: str) -> str:
+    try:
+        return validate_job_id(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert a PDF into a podcast")
+    parser.add_argument("--preview", action="store_true",
+                        help="Render a short preview clip before the full podcast "
+                             "(delays the full render by the preview's synthesis time)")
+    parser.add_argument("--stream-port", type=int, default=None,
+                        help="Serve the episode over chunked HTTP on this port while it renders")
+    parser.add_argument("--job-id", type=parse_job_id, default=None,
+                        help="Name of the job's workspace (random if omitted)")
+    parser.add_argument("--stream-script", action="store_true",
+                        help="Start synthesis on each speaker turn as the LLM streams it")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Render through the shared work queue so workers on other hosts can help")
+    parser.add_argument("--script", default=None, metavar="PATH",
+                        help="Reuse this script (script.jsonl, or a plain-text script to convert) "
+                             "instead of scripting the PDF")
+    parser.add_argument("--turns", type=parse_turn_range, default=None, metavar="START:STOP",
+                        help="Only render this slice of the script's turns (e.g. 100:200)")
+    args = parser.parse_args()
+    if args.preview and args.stream_script and not args.script:
+        # The streamed render starts on the first turns, so there is no window for a preview
+        parser.error("--preview can't be combined with --stream-script; listen to the stream instead")
+    return args
+
+async def main(preview: bool = False, stream_port: Optional[int] = None, job_id: Optional[str] = None,
+               stream_script: bool = False, turn_range: Optional[Tuple[int, Optional[int]]] = None,
+               distributed: bool = False, script: Optional[str] = None):
     start_time = time.time()
+    workspace = None
+    render_task = preview_task = None
+    streamer = None
     try:
         logger.info("🚀 Initializing podcast generation...")
         config = Config()
@@ -24,58 +70,260 @@ async def main():
         current_dir = Path.cwd()
         data_dir = current_dir / 'Data'
         pdf_path = data_dir / 'input.pdf'
-        output_dir = data_dir / 'podcast_episodes'
-        output_dir.mkdir(parents=True, exist_ok=True)
+        workspace = JobWorkspace(data_dir, job_id).create()
         
         logger.info(f"📁 Current directory: {current_dir}")
         logger.info(f"📁 Data directory exists: {data_dir.exists()}")
         logger.info(f"📄 PDF exists: {pdf_path.exists()}")
+        logger.info(f"🗂️ Job {workspace.job_id} scratch: {workspace.scratch_dir}")
         
-        # Initialize XTTS generator
-        use_gpu = torch.cuda.is_available()
+        # Heavy stages (torch/TTS, llama_index, groq) are imported only when they run
         logger.info("🎵 Initializing XTTS2 generator...")
-        audio_generator = XTTSPodcastGenerator(config, use_gpu=use_gpu)
-        logger.info(f"💻 Using {'GPU' if use_gpu else 'CPU'} for audio generation")
+        XTTSPodcastGenerator = timed_import("audio_generator").XTTSPodcastGenerator
+        audio_generator = XTTSPodcastGenerator(config, use_gpu=True)
+        logger.info(f"💻 Using {'GPU' if audio_generator.device == 'cuda' else 'CPU'} for audio generation")
+        if audio_generator.MAX_WORKERS > 1:
+            # TTS_MAX_WORKERS model replicas synthesize a turn's sentences in parallel
+            audio_generator.enable_scheduler(config.tts_max_batch_size, config.tts_max_wait_ms)
+
+        # Text and audio in flight share one budget; producers (LLM scripting) pause when
+        # TTS falls behind, unexported audio piles up, or RSS nears the limit
+        budget = MemoryBudget(
+            config.memory_budget_mb * 1024 ** 2,
+            rss_limit=config.rss_limit_mb * 1024 ** 2 if config.rss_limit_mb else default_rss_limit()
+        )
+        rss_monitor = RSSMonitor(budget).start()
+
+        stream = None
+        if stream_port:
+            AudioStreamer = timed_import("streamer").AudioStreamer
+            streamer = AudioStreamer(max_buffer_bytes=config.stream_buffer_mb * 1024 ** 2)
+            streamer.start(port=stream_port)
+            # Not charged to the budget: STREAM_BUFFER_MB already caps it, and RSS checks still see it
+            stream = streamer.create_stream(workspace.job_id)
+            logger.info(f"📡 Listen live at http://localhost:{stream_port}/stream/{workspace.job_id}")
+
+        loop = asyncio.get_running_loop()
+        output_path = workspace.staging_dir / "podcast_output.mp3"
+        preview_path = workspace.staging_dir / "preview.mp3"
+
+        def log_preview(task):
+            # exception() raises on a cancelled future, so check that first
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                # A preview is a courtesy; the full podcast renders regardless
+                logger.warning(f"⚠️ Preview failed, continuing with the full podcast: {task.exception()}")
+            elif task.result():
+                logger.info(f"🎧 Preview ready: {task.result()}")
 
-        if os.path.exists(config.text_output_path):
-            logger.info(f"📝 Found existing conversation at {config.text_output_path}")
-            with open(config.text_output_path, 'r', encoding='utf-8') as f:
-                full_text = f.read()
+        def start_preview(turns):
+            logger.info(f"🎧 Rendering {config.preview_seconds}s preview...")
+            task = loop.run_in_executor(
+                None,
+                audio_generator.generate_preview_from_turns,
+                turns,
+                str(preview_path),
+                config.preview_seconds * 1000,
+                workspace.temp_audio_dir
+            )
+            task.add_done_callback(log_preview)
+            return task
+
+        # Each job scripts into its own workspace; a shared script is only read when asked for
+        script_path = workspace.script_path
+        if script and ScriptReader.exists(script):
+            script_path = Path(script)
+            logger.info(f"📝 Reusing script at {script_path}")
+        elif script:
+            # One-off migration of a legacy plain-text script to the indexed format
+            logger.info(f"📝 Converting existing conversation at {script}")
+            with open(script, 'r', encoding='utf-8') as f:
+                legacy_text = f.read()
+            with ScriptWriter(script_path) as writer:
+                writer.append_conversation(legacy_text)
         else:
-            pdf_processor = PDFProcessor()
-            conversation_generator = ConversationGenerator(config.groq_api_key)
+            PDFProcessor = timed_import("pdf_processor").PDFProcessor
+            ConversationGenerator = timed_import("conversation_generator").ConversationGenerator
+            pdf_processor = PDFProcessor(prefilter=PDFPreFilter() if config.pdf_prefilter else None)
+            conversation_generator = ConversationGenerator(
+                config.groq_api_key, max_workers=config.llm_max_workers,
+                section_lookahead=config.llm_section_lookahead
+            )
             
             logger.info("📚 Processing PDF...")
             nodes = pdf_processor.process_pdf(pdf_path)
             logger.info(f"📑 Found {len(nodes)} sections in PDF")
+            report = pdf_processor.filter_report
+            if report:
+                logger.info(
+                    f"🧹 Pre-filter dropped {report['nodes_dropped']}/{report['nodes_before']} sections and "
+                    f"{report['tokens_dropped']}/{report['tokens_before']} tokens "
+                    f"({report['boilerplate_lines']} boilerplate lines, {report['reference_lines']} reference lines)"
+                )
 
             logger.info("💭 Generating conversations...")
-            conversations = []
-            for i, node in enumerate(nodes, 1):
-                logger.info(f"🔄 Processing section {i}/{len(nodes)}")
-                conversation = await conversation_generator.generate_conversation_async(
-                    chunk=node.text,
-                    is_first_segment=(i == 1)
-                )
-                conversations.append(conversation)
+            preview_conversations = []
+            turn_queue = None
+            if stream_script:
+                turn_queue = BoundedQueue(budget)
+
+                def render_streamed_turns():
+                    try:
+                        audio_generator.generate_podcast_from_turns(
+                            turn_queue,
+                            str(output_path),
+                            stream,
+                            workspace.temp_audio_dir,
+                            workspace.job_id,
+                            budget
+                        )
+                    except BaseException as e:
+                        # Unblock the producer rather than leave it waiting on a budget nobody drains
+                        turn_queue.fail(e)
+                        raise
+
+                # Audio renders in the background from turns as the LLM emits them
+                report_import_times(config.import_time_budget)
+                logger.info("🎙️ Generating audio podcast from streamed turns...")
+                render_task = loop.run_in_executor(None, render_streamed_turns)
+            try:
+                with ScriptWriter(script_path) as writer:
+                    if stream_script:
+                        for i, node in enumerate(nodes, 1):
+                            logger.info(f"🔄 Processing section {i}/{len(nodes)}")
+                            async for speaker, text, emotion in conversation_generator.stream_conversation_async(
+                                chunk=node.text,
+                                is_first_segment=(i == 1)
+                            ):
+                                if render_task.done():
+                                    # Surfaces the renderer's error and aborts the half-written script
+                                    await render_task
+                                    raise RuntimeError("Audio renderer stopped before the script was finished")
+                                writer.append(speaker, text, node.node_id, emotion)
+                                # put() blocks under backpressure, so keep it off the event loop
+                                await loop.run_in_executor(
+                                    None, turn_queue.put, (speaker, text), len(text.encode('utf-8'))
+                                )
+                    else:
+                        # Sequential unless LLM_SECTION_LOOKAHEAD opts into concurrent sections; saved in order
+                        async for index, conversation in conversation_generator.iter_conversations_async(
+                            [node.text for node in nodes]
+                        ):
+                            i = index + 1
+                            logger.info(f"🔄 Scripted section {i}/{len(nodes)}")
+                            writer.append_conversation(conversation, nodes[index].node_id)
+                            # Only the preview needs raw text in memory; the writer has the rest on disk
+                            if preview and preview_task is None:
+                                preview_conversations.append(conversation)
+                                if i >= config.preview_nodes or i == len(nodes):
+                                    preview_task = start_preview(parse_turns("".join(preview_conversations)))
+                                    preview_conversations = []
+            except BaseException as e:
+                if turn_queue is not None:
+                    # Drop queued turns so the renderer stops promptly instead of finishing them
+                    turn_queue.fail(e)
+                raise
+            finally:
+                if turn_queue is not None:
+                    turn_queue.close()
+            # The plain-text script is now a view derived from the structured one
+            ScriptReader(script_path).export_text(workspace.text_output_path)
 
-            conversation_generator.save_conversations(conversations, config.text_output_path)
-            full_text = "".join(conversations)
+        script = ScriptReader(script_path)
+        logger.info(f"🗒️ Script has {len(script)} turns")
+        start, stop = turn_range or (0, None)
+        if render_task is None and preview and preview_task is None:
+            preview_task = start_preview(script.iter_turns(start, stop))
         
-        logger.info("🎙️ Generating audio podcast...")
-        output_path = output_dir / "podcast_output.mp3"
-        audio_generator.generate_podcast(
-            text=full_text,
-            output_path=str(output_path)
+        if preview_task is not None:
+            # The TTS model is shared, so the full render starts once the preview is out;
+            # wait() doesn't raise, log_preview has already reported any failure
+            await asyncio.wait([preview_task])
+
+        if render_task is not None:
+            await render_task
+        elif distributed:
+            work_queue = timed_import("work_queue")
+            report_import_times(config.import_time_budget)
+            coordinator = work_queue.Coordinator(
+                work_queue.create_broker(config.work_queue_url),
+                work_queue.ResultStore(config.work_results_dir),
+                work_queue.task_profile(audio_generator.engine, audio_generator.precision)
+            )
+            coordinator.submit(workspace.job_id, script.iter_turns(start, stop))
+            # This process renders too, one turn per model replica;
+            # `python work_queue.py` on other hosts adds more workers
+            local_workers = [
+                work_queue.TTSWorker(
+                    audio_generator, coordinator.broker, coordinator.store,
+                    lease_seconds=config.task_lease_seconds
+                )
+                for _ in range(audio_generator.MAX_WORKERS)
+            ]
+            worker_tasks = [loop.run_in_executor(None, worker.run) for worker in local_workers]
+            try:
+                progress = await loop.run_in_executor(None, coordinator.wait, workspace.job_id)
+            finally:
+                for worker in local_workers:
+                    worker.stop()
+                await asyncio.gather(*worker_tasks)
+            if progress["failed"]:
+                raise RuntimeError(f"{progress['failed']} turns failed to render; see the work queue for errors")
+            coordinator.assemble(
+                workspace.job_id, workspace.staging_dir, audio_generator.MAX_EPISODE_LENGTH, stream
+            )
+        else:
+            report_import_times(config.import_time_budget)
+
+            logger.info("🎙️ Generating audio podcast...")
+            # Turns are streamed from disk; only the selected slice is ever read
+            audio_generator.generate_podcast_from_turns(
+                script.iter_turns(start, stop),
+                output_path=str(output_path),
+                stream=stream,
+                temp_dir=workspace.temp_audio_dir,
+                job_id=workspace.job_id,
+                budget=budget
+            )
+        output_dir = workspace.publish()
+        rss_monitor.stop()
+        stats = budget.stats()
+        logger.info(
+            f"🧠 Peak RSS {stats['peak_rss'] / 1024 ** 2:.0f} MB, peak in flight "
+            f"{stats['peak_in_flight'] / 1024 ** 2:.1f} MB, {stats['waits']} producer pauses"
         )
 
         execution_time = time.time() - start_time
         logger.info(f"✨ Completed in {execution_time:.2f} seconds")
-        logger.info(f"📁 Output saved to: {output_path}")
+        logger.info(f"📁 Output saved to: {output_dir}")
 
     except Exception as e:
         logger.error(f"❌ Error: {str(e)}", exc_info=True)
         raise
+    finally:
+        # Executor threads can't be cancelled; let them stop before their scratch dir is removed
+        for task in (render_task, preview_task):
+            if task is not None and not task.done():
+                with suppress(Exception):
+                    await task
+        if streamer is not None:
+            logger.info(f"📡 Waiting up to {config.stream_drain_seconds:.0f}s for listeners to finish...")
+            if not await asyncio.get_running_loop().run_in_executor(
+                None, streamer.drain, workspace.job_id, config.stream_drain_seconds
+            ):
+                logger.warning("📡 Listeners still connected; closing the stream")
+        if workspace is not None:
+            workspace.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(main(
+        preview=args.preview,
+        stream_port=args.stream_port,
+        job_id=args.job_id,
+        stream_script=args.stream_script,
+        turn_range=args.turns,
+        distributed=args.distributed,
+        script=args.script
+    ))
\ No newline at end of file
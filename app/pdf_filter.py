@@ -0,0 +1,106 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+REFERENCES_HEADING = re.compile(
+    r'^\s*(?:\d+\.?\s*|[ivx]+\.\s*)?(references|bibliography|works cited|literature cited)\s*$',
+    re.IGNORECASE
+)
+APPENDIX_HEADING = re.compile(r'^\s*(?:[a-z]\.?\s+)?(appendix|appendices|supplementary material)\b', re.IGNORECASE)
+# Body headings ("3 Method", "Conclusion"); reference entries have commas, years or periods so don't match
+SECTION_HEADING = re.compile(
+    r'^\s*(?:(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+[A-Z][A-Za-z \-]{2,60}'
+    r'|(?:introduction|background|related work|methods?|experiments?|results|evaluation|discussion|conclusions?))\s*$',
+    re.IGNORECASE
+)
+NUMERIC_TOKEN = re.compile(r'^[\d.,%±+\-−()\[\]/]+$')
+
+
+def _normalize_line(line: str) -> str:
+    # Page numbers and dates differ per page; collapse digits so "Page 3" == "Page 7"
+    return re.sub(r'\d+', '#', ' '.join(line.lower().split()))
+
+
+class PDFPreFilter:
+    """Removes low-value text from PDF pages before it reaches the LLM.
+
+    * Boilerplate: short lines (running headers, footers, page numbers)
+      that repeat on at least ``min_page_fraction`` of pages.
+    * References: everything from a References/Bibliography heading up to
+      an Appendix heading, a body section heading or the end of the
+      document. Only headings past ``references_start_fraction`` of the
+      pages count, so a table of contents entry doesn't start the cut.
+    * Tables: chunks where at least ``max_numeric_ratio`` of the tokens
+      are numbers (checked per node via ``is_numeric_table``).
+
+    A filter that removes more than ``max_removed_fraction`` of the text
+    has almost certainly misread the layout; callers should keep the
+    unfiltered text then (see ``removed_too_much``).
+    """
+
+    def __init__(self, min_page_fraction: float = 0.5, min_pages: int = 3,
+                 max_line_length: int = 100, max_numeric_ratio: float = 0.5,
+                 references_start_fraction: float = 0.5, max_removed_fraction: float = 0.5):
+        self.min_page_fraction = min_page_fraction
+        self.min_pages = min_pages
+        self.max_line_length = max_line_length
+        self.max_numeric_ratio = max_numeric_ratio
+        self.references_start_fraction = references_start_fraction
+        self.max_removed_fraction = max_removed_fraction
+
+    def _boilerplate_lines(self, pages: List[str]) -> set:
+        if len(pages) < self.min_pages:
+            return set()
+        counts = Counter()
+        for page in pages:
+            counts.update({
+                _normalize_line(line) for line in page.splitlines()
+                if line.strip() and len(line.strip()) <= self.max_line_length
+            })
+        threshold = max(self.min_pages, self.min_page_fraction * len(pages))
+        return {line for line, count in counts.items() if count >= threshold}
+
+    def filter_pages(self, pages: List[str]) -> Dict[str, object]:
+        """Return cleaned page texts plus counts of what was removed."""
+        boilerplate = self._boilerplate_lines(pages)
+        cleaned, in_references = [], False
+        removed_boilerplate = removed_reference_lines = 0
+
+        for index, page in enumerate(pages):
+            in_tail = (index + 1) / len(pages) > self.references_start_fraction
+            kept = []
+            for line in page.splitlines():
+                if _normalize_line(line) in boilerplate:
+                    removed_boilerplate += 1
+                    continue
+                if in_tail and REFERENCES_HEADING.match(line):
+                    in_references = True
+                elif in_references and (APPENDIX_HEADING.match(line) or SECTION_HEADING.match(line)):
+                    in_references = False
+                if in_references:
+                    removed_reference_lines += 1
+                    continue
+                kept.append(line)
+            cleaned.append("\n".join(kept))
+
+        return {
+            "pages": cleaned,
+            "boilerplate_lines": removed_boilerplate,
+            "reference_lines": removed_reference_lines,
+        }
+
+    def removed_too_much(self, tokens_before: int, tokens_after: int) -> bool:
+        return tokens_before > 0 and (tokens_before - tokens_after) / tokens_before > self.max_removed_fraction
+
+    def is_numeric_table(self, text: str) -> bool:
+        tokens = text.split()
+        if len(tokens) < 20:
+            return False
+        numeric = sum(1 for token in tokens if NUMERIC_TOKEN.match(token))
+        return numeric / len(tokens) >= self.max_numeric_ratio
+
+
+def count_tokens(texts: List[str], tokenizer: Optional[Callable[[str], list]] = None) -> int:
+    if tokenizer is None:
+        return sum(len(text.split()) for text in texts)
+    return sum(len(tokenizer(text)) for text in texts)
@@ -1,18 +1,22 @@
 from llama_index.core import Document
 from llama_index.core.node_parser import SimpleNodeParser
 from llama_index.readers.file import PDFReader
-from typing import List
+from llama_index.core.utils import get_tokenizer
+from typing import List, Optional
 import os
 from pathlib import Path
 import concurrent.futures
+from pdf_filter import PDFPreFilter, count_tokens
 
 class PDFProcessor:
-   def __init__(self):
+   def __init__(self, prefilter: Optional[PDFPreFilter] = None):
        self.parser = SimpleNodeParser.from_defaults(
            chunk_size=500,
            chunk_overlap=50
        )
        self.reader = PDFReader()
+       self.prefilter = prefilter
+       self.filter_report = None
 
    def process_pdf(self, pdf_path: str) -> List[Document]:
        abs_path = str(Path(pdf_path).resolve())
@@ -25,6 +29,49 @@ class PDFProcessor:
                documents = future.result()
                
            nodes = self.parser.get_nodes_from_documents(documents)
+           if self.prefilter is not None:
+               nodes = self._apply_prefilter(documents, nodes)
            return nodes
        except Exception as e:
-           raise Exception(f"Error processing PDF: {str(e)}")
\ No newline at end of file
+           raise Exception(f"Error processing PDF: {str(e)}")
+
+   def _apply_prefilter(self, documents: List[Document], nodes: list) -> list:
+       # PDFReader yields one document per page, which is what boilerplate detection needs
+       result = self.prefilter.filter_pages([doc.text for doc in documents])
+       cleaned_docs = [
+           Document(text=text, metadata=doc.metadata)
+           for doc, text in zip(documents, result["pages"])
+           if text.strip()
+       ]
+       filtered = [
+           node for node in self.parser.get_nodes_from_documents(cleaned_docs)
+           if not self.prefilter.is_numeric_table(node.text)
+       ]
+
+       tokenizer = get_tokenizer()
+       tokens_before = count_tokens([node.text for node in nodes], tokenizer)
+       tokens_after = count_tokens([node.text for node in filtered], tokenizer)
+       if self.prefilter.removed_too_much(tokens_before, tokens_after):
+           print(f"⚠️ Pre-filter would drop {tokens_before - tokens_after} of {tokens_before} tokens, "
+                 f"keeping the unfiltered text")
+           self.filter_report = {
+               "nodes_before": len(nodes),
+               "nodes_after": len(nodes),
+               "nodes_dropped": 0,
+               "tokens_before": tokens_before,
+               "tokens_dropped": 0,
+               "boilerplate_lines": 0,
+               "reference_lines": 0,
+               "fallback": True,
+           }
+           return nodes
+       self.filter_report = {
+           "nodes_before": len(nodes),
+           "nodes_after": len(filtered),
+           "nodes_dropped": len(nodes) - len(filtered),
+           "tokens_before": tokens_before,
+           "tokens_dropped": tokens_before - tokens_after,
+           "boilerplate_lines": result["boilerplate_lines"],
+           "reference_lines": result["reference_lines"],
+       }
+       return filtered
@@ -0,0 +1,105 @@
+import argparse
+import time
+import numpy as np
+import torch
+from typing import Dict, List, Optional
+from config import Config
+from audio_generator import XTTSPodcastGenerator
+
+# Fixed sentence set so runs are comparable across machines and precisions
+CALIBRATION_SENTENCES = [
+    "Welcome back to the show, today we are looking at a new research paper",
+    "The model was trained on a large corpus of technical documents",
+    "That is a fascinating result, how does it compare to the baseline",
+    "In short, the approach reduces latency without sacrificing accuracy",
+    "Let me walk you through the three main contributions of this work",
+]
+
+
+def _average_log_spectrum(wav: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    if len(wav) < n_fft:
+        wav = np.pad(wav, (0, n_fft - len(wav)))
+    window = np.hanning(n_fft)
+    frames = np.lib.stride_tricks.sliding_window_view(wav, n_fft)[::hop] * window
+    magnitude = np.abs(np.fft.rfft(frames, axis=1))
+    return 20 * np.log10(magnitude.mean(axis=0) + 1e-8)
+
+
+def spectral_distance(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """RMS difference (dB) between long-term average spectra.
+
+    XTTS sampling is stochastic and output lengths differ between runs, so a
+    sample-wise comparison is meaningless; the averaged spectrum captures
+    timbre and noise artefacts introduced by reduced precision.
+    """
+    diff = _average_log_spectrum(reference) - _average_log_spectrum(candidate)
+    return float(np.sqrt(np.mean(diff ** 2)))
+
+
+def _synthesize_all(generator: XTTSPodcastGenerator, voice_path: str) -> Dict[str, object]:
+    wavs: List[np.ndarray] = []
+    elapsed = 0.0
+    for i, sentence in enumerate(CALIBRATION_SENTENCES):
+        torch.manual_seed(i)
+        start = time.perf_counter()
+        wav = generator._generate_audio_chunk(sentence, voice_path, "neutral")
+        elapsed += time.perf_counter() - start
+        wavs.append(np.asarray(wav if wav is not None else [], dtype=np.float32))
+
+    audio_seconds = sum(len(w) for w in wavs) / generator.sample_rate
+    return {
+        "wavs": wavs,
+        "elapsed": elapsed,
+        "audio_seconds": audio_seconds,
+        "rtf": elapsed / audio_seconds if audio_seconds else float("inf"),
+    }
+
+
+def run_report(precisions: List[str], num_threads: Optional[int] = None) -> List[Dict[str, float]]:
+    config = Config()
+    results = {}
+    for precision in ["fp32"] + [p for p in precisions if p != "fp32"]:
+        generator = XTTSPodcastGenerator(config, use_gpu=False, precision=precision,
+                                          num_threads=num_threads, engine="xtts")
+        # Warm-up so model load and first-call allocation don't skew timings
+        generator._generate_audio_chunk(CALIBRATION_SENTENCES[0], generator.voices['host'], "neutral")
+        if generator.precision != precision:
+            # Requested mode unsupported here (e.g. bf16 without native support)
+            continue
+        results[precision] = _synthesize_all(generator, generator.voices['host'])
+        del generator
+
+    baseline = results["fp32"]
+    rows = []
+    for precision, result in results.items():
+        distances = [
+            spectral_distance(ref, cand)
+            for ref, cand in zip(baseline["wavs"], result["wavs"])
+            if len(ref) and len(cand)
+        ]
+        rows.append({
+            "precision": precision,
+            "rtf": result["rtf"],
+            "speedup": baseline["elapsed"] / result["elapsed"] if result["elapsed"] else 0.0,
+            "audio_seconds": result["audio_seconds"],
+            "spectral_distance_db": float(np.mean(distances)) if distances else float("nan"),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare XTTS CPU precisions against fp32")
+    parser.add_argument("--precisions", nargs="+", default=["int8", "bf16"],
+                        choices=XTTSPodcastGenerator.PRECISIONS)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    rows = run_report(args.precisions, args.threads)
+    print(f"\n{'precision':<10}{'RTF':>8}{'speedup':>10}{'audio s':>10}{'spec dist dB':>14}")
+    for row in rows:
+        print(f"{row['precision']:<10}{row['rtf']:>8.2f}{row['speedup']:>10.2f}"
+              f"{row['audio_seconds']:>10.1f}{row['spectral_distance_db']:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from turn_parser import EMOTION_SPEED, detect_emotion, parse_turns
+
+# Average conversational pace before the per-emotion speed factor
+WORDS_PER_SECOND = 2.5
+
+# One little-endian uint64 byte offset per turn, so turn i is at 8 * i
+INDEX_ENTRY = struct.Struct('<Q')
+
+
+def estimate_duration(text: str, emotion: str) -> float:
+    return round(len(text.split()) / (WORDS_PER_SECOND * EMOTION_SPEED.get(emotion, 1.0)), 2)
+
+
+def index_path_for(script_path: Path) -> Path:
+    return Path(f"{script_path}.idx")
+
+
+class ScriptWriter:
+    """Writes turn records as JSON lines plus a fixed-width offset index.
+
+    Both files are written under temporary names and renamed on ``close``,
+    so an interrupted run never leaves a script that looks complete.
+    """
+
+    def __init__(self, script_path: str):
+        self.script_path = Path(script_path)
+        self.index_path = index_path_for(self.script_path)
+        self.script_path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_script = self.script_path.with_name(self.script_path.name + ".tmp")
+        self._tmp_index = self.index_path.with_name(self.index_path.name + ".tmp")
+        self._script = open(self._tmp_script, 'wb')
+        self._index = open(self._tmp_index, 'wb')
+        self.count = 0
+
+    def append(self, speaker: str, text: str, node_id: Optional[str] = None,
+               emotion: Optional[str] = None) -> Dict[str, object]:
+        # The LLM's own [tag] wins; punctuation heuristics only fill in untagged turns
+        emotion = emotion or detect_emotion(text)
+        record = {
+            "turn": self.count,
+            "speaker": speaker,
+            "text": text,
+            "node_id": node_id,
+            "emotion": emotion,
+            "est_duration_s": estimate_duration(text, emotion),
+        }
+        self._index.write(INDEX_ENTRY.pack(self._script.tell()))
+        self._script.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.count += 1
+        return record
+
+    def append_conversation(self, conversation: str, node_id: Optional[str] = None) -> int:
+        turns = parse_turns(conversation, with_emotion=True)
+        for speaker, text, emotion in turns:
+            self.append(speaker, text, node_id, emotion)
+        return len(turns)
+
+    def close(self):
+        if self._script.closed:
+            return
+        self._script.close()
+        self._index.close()
+        os.replace(self._tmp_script, self.script_path)
+        os.replace(self._tmp_index, self.index_path)
+
+    def abort(self):
+        self._script.close()
+        self._index.close()
+        for path in (self._tmp_script, self._tmp_index):
+            if path.exists():
+                path.unlink()
+
+    def __enter__(self) -> "ScriptWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ScriptReader:
+    """Random access to turns of a script written by ScriptWriter."""
+
+    def __init__(self, script_path: str):
+        self.script_path = Path(script_path)
+        self.index_path = index_path_for(self.script_path)
+        if not self.script_path.exists() or not self.index_path.exists():
+            raise FileNotFoundError(f"Structured script not found at {self.script_path}")
+
+    @staticmethod
+    def exists(script_path: str) -> bool:
+        path = Path(script_path)
+        return path.exists() and index_path_for(path).exists()
+
+    def __len__(self) -> int:
+        return self.index_path.stat().st_size // INDEX_ENTRY.size
+
+    def _offset(self, index_file, turn: int) -> int:
+        index_file.seek(turn * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(index_file.read(INDEX_ENTRY.size))[0]
+
+    def read_range(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, object]]:
+        """Load turns[start:stop] with one seek instead of scanning the file."""
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        if start >= stop:
+            return []
+        with open(self.index_path, 'rb') as index_file, open(self.script_path, 'rb') as script_file:
+            script_file.seek(self._offset(index_file, start))
+            return [json.loads(script_file.readline()) for _ in range(stop - start)]
+
+    def __getitem__(self, turn: int) -> Dict[str, object]:
+        if turn < 0:
+            turn += len(self)
+        records = self.read_range(turn, turn + 1)
+        if not records:
+            raise IndexError(turn)
+        return records[0]
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        with open(self.script_path, 'rb') as script_file:
+            for line in script_file:
+                yield json.loads(line)
+
+    def iter_turns(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """Stream (speaker, text) pairs from disk without holding the script in memory."""
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        if start >= stop:
+            return
+        with open(self.index_path, 'rb') as index_file:
+            offset = self._offset(index_file, start)
+        with open(self.script_path, 'rb') as script_file:
+            script_file.seek(offset)
+            for _ in range(stop - start):
+                record = json.loads(script_file.readline())
+                yield record["speaker"], record["text"]
+
+    def turns(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[str, str]]:
+        return [(record["speaker"], record["text"]) for record in self.read_range(start, stop)]
+
+    def export_text(self, output_path: str) -> str:
+        """Write the plain-text view (``Speaker: text`` blocks) derived from the records."""
+        text = "\n\n".join(f"{record['speaker']}: {record['text']}" for record in self) + "\n"
+        with open(output_path, 'w', encoding='utf-8', buffering=8192) as f:
+            f.write(text)
+        return text
@@ -0,0 +1,74 @@
+from flask import Flask, Response, stream_with_context
+import threading
+from typing import Dict, Optional
+from audio_stream import AudioStream
+
+
+class AudioStreamer:
+    """Serves in-progress renders over chunked HTTP as they are synthesized."""
+
+    def __init__(self, max_buffer_bytes: Optional[int] = None):
+        self.app = Flask(__name__)
+        self.max_buffer_bytes = max_buffer_bytes
+        self.streams: Dict[str, AudioStream] = {}
+        self._lock = threading.Lock()
+        self.setup_routes()
+
+    def setup_routes(self):
+        @self.app.route('/health')
+        def health():
+            return {"status": "ok", "streams": len(self.streams)}
+
+        @self.app.route('/stream/<job_id>')
+        def stream(job_id):
+            audio_stream = self.streams.get(job_id)
+            if audio_stream is None:
+                return Response("Unknown stream", status=404)
+            # A generator body makes Flask send Transfer-Encoding: chunked
+            return Response(
+                stream_with_context(audio_stream.iter_chunks()),
+                mimetype='audio/mpeg',
+                headers={"Cache-Control": "no-cache"}
+            )
+
+        @self.app.route('/streams')
+        def list_streams():
+            return {
+                job_id: {"closed": audio_stream.closed, "listeners": audio_stream.listeners}
+                for job_id, audio_stream in self.streams.items()
+            }
+
+    def create_stream(self, job_id: str) -> AudioStream:
+        with self._lock:
+            if job_id not in self.streams:
+                self.streams[job_id] = AudioStream(job_id, self.max_buffer_bytes)
+            return self.streams[job_id]
+
+    def remove_stream(self, job_id: str):
+        with self._lock:
+            audio_stream = self.streams.pop(job_id, None)
+        if audio_stream is not None:
+            audio_stream.discard()
+
+    def drain(self, job_id: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a finished stream's listeners to disconnect, then drop the stream.
+
+        The server runs on a daemon thread, so callers must do this before
+        exiting or listeners still downloading are cut off mid-episode.
+        """
+        audio_stream = self.streams.get(job_id)
+        if audio_stream is not None:
+            # Normally already closed by the render; make sure listeners reach the end
+            audio_stream.close()
+        drained = audio_stream is None or audio_stream.wait_for_listeners(timeout)
+        self.remove_stream(job_id)
+        return drained
+
+    def start(self, port=5000):
+        self.flask_thread = threading.Thread(
+            target=self.app.run,
+            kwargs={'port': port, 'host': '0.0.0.0', 'threaded': True},
+            daemon=True
+        )
+        self.flask_thread.start()
+        print(f"\nStreaming server started at http://localhost:{port}")
@@ -0,0 +1,249 @@
+import torch
+import numpy as np
+import os
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from tts_compile import COMPILE_MODES, XTTSAccelerator
+
+# Every precision some backend understands; each backend lists the subset it supports
+PRECISIONS = ("fp32", "int8", "bf16")
+
+
+def _replace_conv1d_with_linear(module: torch.nn.Module) -> int:
+    """Swap HF GPT-2 ``Conv1D`` layers for equivalent ``nn.Linear`` so dynamic quantization sees them.
+
+    ``Conv1D`` computes ``x @ weight + bias`` with weight stored as
+    (in_features, out_features), i.e. a Linear with a transposed weight.
+    """
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except ImportError:
+        try:
+            from transformers.modeling_utils import Conv1D
+        except ImportError:
+            return 0
+    replaced = 0
+    for name, child in list(module.named_children()):
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            linear.weight.data.copy_(child.weight.data.t())
+            if child.bias is not None:
+                linear.bias.data.copy_(child.bias.data)
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _replace_conv1d_with_linear(child)
+    return replaced
+
+
+class TTSBackend(ABC):
+    """Common contract for speech engines used by XTTSPodcastGenerator.
+
+    A batch is a list of ``(text, voice)`` pairs where ``voice`` is a value
+    from ``backend.voices``; ``synthesize`` returns one float32 array per
+    item (``None`` for items that failed) at ``backend.sample_rate``.
+    """
+
+    name = "base"
+    PRECISIONS = ("fp32",)
+    COMPILE_MODES = ("eager",)
+
+    def __init__(self, device: str = "cpu", precision: str = "fp32", num_threads: Optional[int] = None,
+                 compile_mode: str = "eager", compile_cache_dir: Optional[str] = None,
+                 parity_tolerance: float = 0.05):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+        if compile_mode not in COMPILE_MODES:
+            raise ValueError(f"Unknown compile mode '{compile_mode}', expected one of {COMPILE_MODES}")
+        # TTS_PRECISION/TTS_COMPILE are global, so a setting meant for another engine isn't an error
+        if precision not in self.PRECISIONS:
+            print(f"⚠️ {self.name} does not support {precision} precision, falling back to fp32")
+            precision = "fp32"
+        if compile_mode not in self.COMPILE_MODES:
+            print(f"⚠️ {self.name} does not support {compile_mode} inference, falling back to eager")
+            compile_mode = "eager"
+        self.device = device
+        self.precision = precision
+        self.num_threads = num_threads
+        self.compile_mode = compile_mode
+        self.compile_cache_dir = compile_cache_dir
+        self.parity_tolerance = parity_tolerance
+        self.compile_report: Dict[str, object] = {"mode": "eager"}
+        self.sample_rate = 22050
+        self.voices: Dict[str, str] = {}
+        self._autocast_dtype = None
+
+    @abstractmethod
+    def load(self, reference_audio_path: Path):
+        ...
+
+    @abstractmethod
+    def synthesize(self, batch: List[Tuple[str, str]]) -> List[Optional[np.ndarray]]:
+        ...
+
+    def _pin_threads(self):
+        if self.device == "cpu" and self.num_threads:
+            torch.set_num_threads(self.num_threads)
+            try:
+                torch.set_num_interop_threads(max(1, self.num_threads // 2))
+            except RuntimeError:
+                # Interop pool can only be sized once per process
+                pass
+
+    def _inference_context(self):
+        if self._autocast_dtype is not None:
+            return torch.autocast("cpu", dtype=self._autocast_dtype)
+        return nullcontext()
+
+
+class XTTSBackend(TTSBackend):
+    """Voice-cloning XTTS v2: slow, highest quality."""
+
+    name = "xtts"
+    PRECISIONS = ("fp32", "int8", "bf16")
+    COMPILE_MODES = COMPILE_MODES
+    MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+    def load(self, reference_audio_path: Path):
+        from TTS.api import TTS  # Several seconds to import; only pay it when a model loads
+        self._pin_threads()
+        self.model = TTS(self.MODEL_NAME).to(self.device)
+        torch.set_grad_enabled(False)
+        self.sample_rate = getattr(self.model.synthesizer, "output_sample_rate", None) or 22050
+
+        self.voices = {
+            'host': str(reference_audio_path / "female_02.wav"),
+            'expert': str(reference_audio_path / "male_01.wav")
+        }
+        for role, path in self.voices.items():
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Voice file for {role} not found at {path}")
+
+        self._apply_precision()
+        self._accelerate()
+
+    def _apply_precision(self):
+        if self.precision == "fp32":
+            return
+        if self.device != "cpu":
+            # Labels reach logs, the tuning profile and result-store keys, so they must match what runs
+            print(f"⚠️ {self.precision} inference is CPU-only, falling back to fp32 on {self.device}")
+            self.precision = "fp32"
+            return
+
+        if self.precision == "int8":
+            tts_model = self.model.synthesizer.tts_model
+            # The GPT decoder's attention/MLP projections are HF Conv1D, not nn.Linear;
+            # without this the autoregressive hot path would stay fp32
+            converted = _replace_conv1d_with_linear(tts_model)
+            torch.quantization.quantize_dynamic(
+                tts_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            print(f"⚙️ Applied dynamic int8 quantization to linear layers ({converted} GPT Conv1D layers converted)")
+        elif self.precision == "bf16":
+            if self._cpu_supports_bf16():
+                self._autocast_dtype = torch.bfloat16
+                print("⚙️ Using bfloat16 autocast on CPU")
+            else:
+                print("⚠️ CPU lacks native bfloat16 support, falling back to fp32")
+                self.precision = "fp32"
+
+    def _accelerate(self):
+        if self.compile_mode == "eager":
+            return
+        # Runs after quantization/autocast setup so parity is checked against what jobs will run
+        accelerator = XTTSAccelerator(
+            self.model.synthesizer.tts_model,
+            self.compile_mode,
+            self.compile_cache_dir or str(Path(self.voices['host']).parent.parent / "compile_cache"),
+            device=self.device,
+            precision=self.precision,
+            tolerance=self.parity_tolerance,
+            inference_context=self._inference_context
+        )
+        self.compile_report = accelerator.apply(self.voices['host'])
+        self.compile_mode = self.compile_report["mode"]
+
+    @staticmethod
+    def _cpu_supports_bf16() -> bool:
+        try:
+            return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+        except (AttributeError, RuntimeError):
+            return False
+
+    def synthesize(self, batch: List[Tuple[str, str]]) -> List[Optional[np.ndarray]]:
+        results = []
+        for text, voice_path in batch:
+            try:
+                with self._inference_context():
+                    wav = self.model.tts(
+                        text=text,
+                        speaker_wav=voice_path,
+                        language="en"
+                    )
+                results.append(np.asarray(wav, dtype=np.float32))
+            except Exception as e:
+                print(f"❌ Error generating chunk: {str(e)}")
+                results.append(None)
+        return results
+
+
+class VITSBackend(TTSBackend):
+    """Multi-speaker VCTK VITS: non-autoregressive, for draft/preview renders."""
+
+    name = "vits"
+    PRECISIONS = ("fp32", "int8")
+    MODEL_NAME = "tts_models/en/vctk/vits"
+
+    def load(self, reference_audio_path: Path):
+        from TTS.api import TTS
+        self._pin_threads()
+        self.model = TTS(self.MODEL_NAME).to(self.device)
+        torch.set_grad_enabled(False)
+        self.sample_rate = getattr(self.model.synthesizer, "output_sample_rate", None) or 22050
+
+        # Built-in VCTK speakers roughly matching the XTTS reference voices
+        self.voices = {
+            'host': "p225",
+            'expert': "p226"
+        }
+
+        if self.device != "cpu" and self.precision == "int8":
+            print(f"⚠️ int8 inference is CPU-only, falling back to fp32 on {self.device}")
+            self.precision = "fp32"
+        elif self.precision == "int8":
+            torch.quantization.quantize_dynamic(
+                self.model.synthesizer.tts_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            print("⚙️ Applied dynamic int8 quantization to linear layers")
+
+    def synthesize(self, batch: List[Tuple[str, str]]) -> List[Optional[np.ndarray]]:
+        results = []
+        for text, speaker in batch:
+            try:
+                wav = self.model.tts(text=text, speaker=speaker)
+                results.append(np.asarray(wav, dtype=np.float32))
+            except Exception as e:
+                print(f"❌ Error generating chunk: {str(e)}")
+                results.append(None)
+        return results
+
+
+BACKENDS = {
+    XTTSBackend.name: XTTSBackend,
+    VITSBackend.name: VITSBackend,
+}
+
+
+def create_backend(engine: str, device: str = "cpu", precision: str = "fp32",
+                   num_threads: Optional[int] = None, compile_mode: str = "eager",
+                   compile_cache_dir: Optional[str] = None, parity_tolerance: float = 0.05) -> TTSBackend:
+    if engine not in BACKENDS:
+        raise ValueError(f"Unknown TTS engine '{engine}', expected one of {tuple(BACKENDS)}")
+    return BACKENDS[engine](
+        device=device, precision=precision, num_threads=num_threads, compile_mode=compile_mode,
+        compile_cache_dir=compile_cache_dir, parity_tolerance=parity_tolerance
+    )
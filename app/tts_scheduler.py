@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Deque, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from tts_backends import TTSBackend
+
+
+class TTSScheduler:
+    """Collects sentences from all active jobs and feeds a pool of backend replicas.
+
+    Requests are queued per job. Each replica has its own dispatcher
+    thread, which forms a batch as soon as ``max_batch_size`` items are
+    pending or the oldest item has waited ``max_wait_ms``, taking one item
+    per job in round-robin order so a long document cannot starve a short
+    one. Pending work is split across idle replicas, so throughput grows
+    with the number of replicas rather than staying at one model's worth.
+    Each caller gets a Future that resolves to the array for its sentence.
+    """
+
+    def __init__(self, backends: Union[TTSBackend, Sequence[TTSBackend]],
+                 max_batch_size: int = 8, max_wait_ms: int = 50):
+        self.backends = [backends] if isinstance(backends, TTSBackend) else list(backends)
+        if not self.backends:
+            raise ValueError("TTSScheduler needs at least one backend")
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queues: "OrderedDict[str, Deque[Tuple[str, str, Future, float]]]" = OrderedDict()
+        self._pending = 0
+        self._idle = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._threads: List[threading.Thread] = []
+        self.stats = {"batches": 0, "items": 0, "replicas": len(self.backends)}
+
+    def start(self) -> "TTSScheduler":
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._run, args=(backend,), name=f"tts-scheduler-{i}", daemon=True)
+            for i, backend in enumerate(self.backends)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def submit(self, job_id: str, text: str, voice: str) -> Future:
+        future: Future = Future()
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("TTS scheduler is not running")
+            self._queues.setdefault(job_id, deque()).append((text, voice, future, time.monotonic()))
+            self._pending += 1
+            self._condition.notify_all()
+        return future
+
+    def synthesize(self, job_id: str, batch: List[Tuple[str, str]]) -> List[Optional[np.ndarray]]:
+        """Blocking helper with the same contract as ``TTSBackend.synthesize``."""
+        futures = [self.submit(job_id, text, voice) for text, voice in batch]
+        return [future.result() for future in futures]
+
+    def _oldest_enqueued(self) -> float:
+        return min(queue[0][3] for queue in self._queues.values() if queue)
+
+    def _take_batch(self) -> List[Tuple[str, str, Future, float]]:
+        # Leave a share of the backlog for every other idle replica
+        limit = min(self.max_batch_size, -(-self._pending // (self._idle + 1)))
+        batch = []
+        while len(batch) < limit and self._queues:
+            # Serve the job at the head, then send it to the back of the line
+            job_id, queue = next(iter(self._queues.items()))
+            batch.append(queue.popleft())
+            self._pending -= 1
+            if queue:
+                self._queues.move_to_end(job_id)
+            else:
+                del self._queues[job_id]
+        return batch
+
+    def _run(self, backend: TTSBackend):
+        while True:
+            with self._condition:
+                self._idle += 1
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running and not self._pending:
+                    self._idle -= 1
+                    return
+                # Wait for a full batch, but never hold the oldest request past max_wait
+                while self._running and 0 < self._pending < self.max_batch_size:
+                    remaining = self._oldest_enqueued() + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._idle -= 1
+                batch = self._take_batch()
+                if not batch:
+                    # Another replica drained the queues while this one waited
+                    continue
+
+            try:
+                results = backend.synthesize([(text, voice) for text, voice, _, _ in batch])
+            except Exception as e:
+                for _, _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, _, future, _), result in zip(batch, results):
+                future.set_result(result)
+            with self._condition:
+                self.stats["batches"] += 1
+                self.stats["items"] += len(batch)
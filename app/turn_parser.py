@@ -0,0 +1,87 @@
+import re
+from typing import List, Optional, Tuple
+
+SPEAKER_LABEL = re.compile(r'(Host|T\.E):')
+EMOTION_TAG = re.compile(r'\[.*?\]')
+# The LLM usually opens a turn with its emotion, e.g. "Host: [curious] So..."
+LEADING_EMOTION_TAG = re.compile(r'^\s*\[([^\]]+)\]')
+
+# Relative speaking rate per detected emotion
+EMOTION_SPEED = {
+    'neutral': 1.0,
+    'excited': 1.2,
+    'thoughtful': 0.9,
+    'serious': 1.0,
+    'confident': 1.1
+}
+
+
+def clean_turn(text: str) -> str:
+    # Emotion tags like "[curious]" are stage directions, not speech
+    return ' '.join(EMOTION_TAG.sub('', text).split())
+
+
+def tagged_emotion(text: str) -> Optional[str]:
+    """The emotion from a turn's leading ``[tag]``, or None if it has none."""
+    match = LEADING_EMOTION_TAG.match(text)
+    if match is None:
+        return None
+    return ' '.join(match.group(1).lower().split()) or None
+
+
+def detect_emotion(text: str) -> str:
+    text_lower = text.lower()
+    if '!' in text:
+        return 'excited'
+    elif '?' in text:
+        return 'thoughtful'
+    elif any(word in text_lower for word in ['must', 'should', 'will']):
+        return 'serious'
+    elif any(word in text_lower for word in ['absolutely', 'certainly']):
+        return 'confident'
+    return 'neutral'
+
+
+class SpeakerTurnParser:
+    """Incrementally splits a script into ``(speaker, text)`` turns.
+
+    Text can be fed in arbitrary pieces (e.g. LLM tokens). A turn is only
+    complete once the next speaker label arrives, so ``feed`` returns the
+    turns closed by that piece and ``close`` flushes the last one. With
+    ``with_emotion`` turns are ``(speaker, text, emotion)``, where emotion
+    is the turn's leading tag (None if untagged) before tags are stripped.
+    """
+
+    def __init__(self, with_emotion: bool = False):
+        self.with_emotion = with_emotion
+        self._buffer = ""
+
+    def _make_turn(self, speaker: str, raw_text: str) -> List[Tuple[str, ...]]:
+        text = clean_turn(raw_text)
+        if not text:
+            return []
+        if self.with_emotion:
+            return [(speaker, text, tagged_emotion(raw_text))]
+        return [(speaker, text)]
+
+    def feed(self, text: str) -> List[Tuple[str, ...]]:
+        self._buffer += text
+        labels = list(SPEAKER_LABEL.finditer(self._buffer))
+        turns = []
+        for current, following in zip(labels, labels[1:]):
+            turns.extend(self._make_turn(current.group(1), self._buffer[current.end():following.start()]))
+        if len(labels) > 1:
+            self._buffer = self._buffer[labels[-1].start():]
+        return turns
+
+    def close(self) -> List[Tuple[str, ...]]:
+        label = SPEAKER_LABEL.search(self._buffer)
+        buffer, self._buffer = self._buffer, ""
+        if label is None:
+            return []
+        return self._make_turn(label.group(1), buffer[label.end():])
+
+
+def parse_turns(text: str, with_emotion: bool = False) -> List[Tuple[str, ...]]:
+    parser = SpeakerTurnParser(with_emotion)
+    return parser.feed(text) + parser.close()
@@ -0,0 +1,417 @@
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydub import AudioSegment
+from audio_stream import AudioStream
+
+logger = logging.getLogger(__name__)
+
+# A task whose worker has been silent this long is handed to someone else
+DEFAULT_LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+
+
+def task_profile(engine: str, precision: str) -> str:
+    """Workers only take tasks rendered with the same engine and precision as their model."""
+    return f"{engine}/{precision}"
+
+
+def result_key(profile: str, speaker: str, text: str) -> str:
+    return hashlib.sha256(f"{profile}\0{speaker}\0{text}".encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """Content-addressed WAV files shared by every worker and the coordinator.
+
+    A turn's audio is stored under the hash of its profile, speaker and
+    text, so identical turns (re-runs, repeated intros, overlapping jobs)
+    are only ever synthesized once. Files appear via rename, never
+    half-written.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.wav"
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    def put(self, key: str, wav_path: str) -> Path:
+        destination = self.path_for(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{key}.{uuid.uuid4().hex[:8]}.tmp")
+        shutil.move(wav_path, tmp_path)
+        os.replace(tmp_path, destination)
+        return destination
+
+
+class TaskBroker(ABC):
+    """Common contract for the queue between the coordinator and TTS workers.
+
+    A task is one speaker turn of a job, identified by ``(job_id, turn)``.
+    Workers ``claim`` a task under a time-limited lease and either
+    ``complete`` or ``fail`` it; expired leases are claimable again, so a
+    worker that dies mid-turn only delays that turn.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def publish(self, job_id: str, tasks: Iterable[Dict[str, object]]) -> int:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str, profile: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, object]]:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, turn: int):
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, turn: int, error: str):
+        ...
+
+    @abstractmethod
+    def progress(self, job_id: str) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    def results(self, job_id: str) -> List[Tuple[int, str]]:
+        """``(turn, key)`` for every finished turn of the job, in script order."""
+
+
+class SQLiteBroker(TaskBroker):
+    """Broker backed by one SQLite file.
+
+    Fine for workers on one host, or on several hosts sharing a filesystem
+    with working POSIX locks. Larger fleets should plug in a broker with
+    the same interface on top of a proper message queue.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            job_id TEXT NOT NULL,
+            turn INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            speaker TEXT NOT NULL,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            lease_until REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            PRIMARY KEY (job_id, turn)
+        );
+        CREATE INDEX IF NOT EXISTS tasks_claimable ON tasks (profile, status, lease_until);
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the broker safe to share between threads
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def publish(self, job_id: str, tasks: Iterable[Dict[str, object]]) -> int:
+        rows = [
+            (job_id, task["turn"], task["key"], task["profile"], task["speaker"], task["text"], task["status"])
+            for task in tasks
+        ]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Re-publishing a job starts it over
+            conn.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
+            conn.executemany(
+                "INSERT INTO tasks (job_id, turn, key, profile, speaker, text, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        return len(rows)
+
+    @staticmethod
+    def _expire_leases(conn: sqlite3.Connection, now: float):
+        # A task whose worker keeps dying (e.g. OOM on one turn) must not be re-leased forever
+        conn.execute(
+            """UPDATE tasks SET status = 'failed', lease_until = NULL,
+               error = COALESCE(error, 'lease expired ' || attempts || ' times')
+               WHERE status = 'leased' AND lease_until < ? AND attempts >= ?""",
+            (now, MAX_ATTEMPTS)
+        )
+
+    def claim(self, worker_id: str, profile: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Dict[str, object]]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front, so two workers can't claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                """SELECT rowid, * FROM tasks
+                   WHERE profile = ? AND (status = 'pending'
+                       OR (status = 'leased' AND lease_until < ? AND attempts < ?))
+                   ORDER BY rowid LIMIT 1""",
+                (profile, now, MAX_ATTEMPTS)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE rowid = ?",
+                (worker_id, now + lease_seconds, row["rowid"])
+            )
+            conn.execute("COMMIT")
+        return {name: row[name] for name in row.keys() if name != "rowid"}
+
+    def complete(self, job_id: str, turn: int):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'done', lease_until = NULL, error = NULL WHERE job_id = ? AND turn = ?",
+                (job_id, turn)
+            )
+
+    def fail(self, job_id: str, turn: int, error: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   lease_until = NULL, error = ? WHERE job_id = ? AND turn = ?""",
+                (MAX_ATTEMPTS, error, job_id, turn)
+            )
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        with closing(self._connect()) as conn:
+            # Expire here too, so the coordinator notices dead tasks even with no live workers
+            self._expire_leases(conn, time.time())
+            for status, count in conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,)
+            ):
+                counts[status] = count
+        return counts
+
+    def results(self, job_id: str) -> List[Tuple[int, str]]:
+        with closing(self._connect()) as conn:
+            return [
+                (row["turn"], row["key"]) for row in conn.execute(
+                    "SELECT turn, key FROM tasks WHERE job_id = ? AND status = 'done' ORDER BY turn", (job_id,)
+                )
+            ]
+
+
+BROKERS = {
+    SQLiteBroker.name: SQLiteBroker,
+}
+
+
+def create_broker(url: str) -> TaskBroker:
+    """Build a broker from ``<kind>://<location>``; a bare path means SQLite."""
+    kind, _, location = url.partition("://")
+    if not location:
+        kind, location = SQLiteBroker.name, url
+    if kind not in BROKERS:
+        raise ValueError(f"Unknown broker '{kind}', expected one of {tuple(BROKERS)}")
+    return BROKERS[kind](location)
+
+
+class TTSWorker:
+    """Pulls turns from a broker, synthesizes them and stores the results.
+
+    Run one per model replica, on as many hosts as share the broker and
+    the result store.
+    """
+
+    def __init__(self, generator, broker: TaskBroker, store: ResultStore,
+                 worker_id: Optional[str] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.generator = generator
+        self.broker = broker
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.lease_seconds = lease_seconds
+        self.profile = task_profile(generator.engine, generator.precision)
+        self.processed = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _render(self, task: Dict[str, object], temp_dir: Path):
+        is_host = task["speaker"] == "Host"
+        segment_path = self.generator._process_segment(
+            text=task["text"],
+            is_host=is_host,
+            emotion=self.generator._detect_emotion(task["text"], is_host),
+            index=task["key"],
+            temp_dir=temp_dir,
+            job_id=task["job_id"]
+        )
+        if segment_path:
+            self.store.put(task["key"], segment_path)
+        elif self.generator._speakable_chunks(task["text"]):
+            # _process_segment swallows synthesis errors; don't let them pass as empty turns
+            raise RuntimeError("synthesis produced no audio")
+        # Otherwise the turn has nothing speakable and is skipped on assembly
+
+    def run_once(self, temp_dir: Path) -> bool:
+        task = self.broker.claim(self.worker_id, self.profile, self.lease_seconds)
+        if task is None:
+            return False
+        try:
+            # Another job (or an earlier attempt) may already have produced this exact turn
+            if not self.store.exists(task["key"]):
+                self._render(task, temp_dir)
+        except Exception as e:
+            logger.warning(f"⚠️ Turn {task['turn']} of {task['job_id']} failed: {e}")
+            self.broker.fail(task["job_id"], task["turn"], str(e))
+        else:
+            self.broker.complete(task["job_id"], task["turn"])
+            self.processed += 1
+        return True
+
+    def run(self, poll_interval: float = 1.0, exit_when_idle: bool = False):
+        temp_dir = self.generator._job_temp_dir()
+        logger.info(f"👷 Worker {self.worker_id} taking {self.profile} tasks")
+        try:
+            while not self._stop.is_set():
+                if not self.run_once(temp_dir) and (exit_when_idle or self._stop.wait(poll_interval)):
+                    break
+        finally:
+            self.generator.cleanup(temp_dir)
+        logger.info(f"👷 Worker {self.worker_id} stopped after {self.processed} turns")
+
+
+class Coordinator:
+    """Splits a job into turn tasks, waits for the workers and assembles episodes."""
+
+    def __init__(self, broker: TaskBroker, store: ResultStore, profile: str):
+        self.broker = broker
+        self.store = store
+        self.profile = profile
+
+    def submit(self, job_id: str, turns: Iterable[Tuple[str, str]]) -> int:
+        def tasks() -> Iterator[Dict[str, object]]:
+            for turn, (speaker, text) in enumerate(turns):
+                key = result_key(self.profile, speaker, text)
+                yield {
+                    "turn": turn,
+                    "key": key,
+                    "profile": self.profile,
+                    "speaker": speaker,
+                    "text": text,
+                    "status": "done" if self.store.exists(key) else "pending",
+                }
+        count = self.broker.publish(job_id, tasks())
+        progress = self.broker.progress(job_id)
+        logger.info(f"📤 Published {count} turns for {job_id} ({progress['done']} already rendered)")
+        return count
+
+    def wait(self, job_id: str, poll_interval: float = 2.0, timeout: Optional[float] = None) -> Dict[str, int]:
+        deadline = time.monotonic() + timeout if timeout else None
+        last_done = -1
+        while True:
+            progress = self.broker.progress(job_id)
+            if progress["done"] != last_done:
+                total = sum(progress.values())
+                logger.info(f"⏳ {progress['done']}/{total} turns rendered, {progress['leased']} in progress")
+                last_done = progress["done"]
+            if progress["pending"] == 0 and progress["leased"] == 0:
+                return progress
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} still has {progress['pending'] + progress['leased']} unfinished turns")
+            time.sleep(poll_interval)
+
+    def assemble(self, job_id: str, episodes_dir: Path, max_episode_ms: int,
+                 stream: Optional[AudioStream] = None) -> List[Path]:
+        """Concatenate finished turns in script order into episode_N.mp3 files."""
+        episodes_dir = Path(episodes_dir)
+        episodes_dir.mkdir(parents=True, exist_ok=True)
+        episodes = []
+        current_audio = AudioSegment.empty()
+
+        def export():
+            episode_path = episodes_dir / f"episode_{len(episodes) + 1}.mp3"
+            current_audio.export(str(episode_path), format="mp3", parameters=["-q:a", "2"])
+            episodes.append(episode_path)
+            logger.info(f"💿 Saved Episode {len(episodes)}")
+
+        try:
+            for turn, key in self.broker.results(job_id):
+                if not self.store.exists(key):
+                    continue
+                segment_audio = AudioSegment.from_wav(str(self.store.path_for(key)))
+                if len(current_audio) + len(segment_audio) > max_episode_ms and len(current_audio) > 0:
+                    export()
+                    current_audio = AudioSegment.empty()
+                if stream is not None:
+                    stream.append(segment_audio if not episodes and len(current_audio) == 0
+                                  else AudioSegment.silent(duration=250) + segment_audio)
+                if len(current_audio) > 0:
+                    current_audio += AudioSegment.silent(duration=250)
+                current_audio += segment_audio
+            if len(current_audio) > 0:
+                export()
+        finally:
+            if stream is not None:
+                stream.close()
+        return episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a TTS worker that renders turns from a shared queue")
+    parser.add_argument("--broker", default=None, help="Broker URL or SQLite path (defaults to WORK_QUEUE_URL)")
+    parser.add_argument("--results", default=None, help="Shared result directory (defaults to WORK_RESULTS_DIR)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is empty")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from config import Config
+    from audio_generator import XTTSPodcastGenerator
+
+    config = Config()
+    generator = XTTSPodcastGenerator(config, use_gpu=True)
+    broker = create_broker(args.broker or config.work_queue_url)
+    store = ResultStore(args.results or config.work_results_dir)
+    # One worker thread per model replica (TTS_MAX_WORKERS)
+    if generator.MAX_WORKERS > 1:
+        generator.enable_scheduler(config.tts_max_batch_size, config.tts_max_wait_ms)
+    workers = [
+        TTSWorker(generator, broker, store, lease_seconds=config.task_lease_seconds)
+        for _ in range(generator.MAX_WORKERS)
+    ]
+    threads = [
+        threading.Thread(target=worker.run, kwargs={"exit_when_idle": args.exit_when_idle}, daemon=True)
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()